@@ -116,6 +116,8 @@ def configure_tcp_line_colors(motion_group: str):
         ("tcp_orientation_acceleration_upper_limit", [176, 49, 40], 4),
         ("tcp_velocity_limit", [176, 49, 40], 4),
         ("tcp_orientation_velocity_limit", [176, 49, 40], 4),
+        ("manipulability", [136, 58, 255], 2),
+        ("singularity_proximity", [176, 49, 40], 2),
     ]
     for name, color, width in series_specs:
         rr.log(
@@ -202,6 +204,15 @@ def create_tcp_tabs(
             time_ranges=time_ranges,
             plot_legend=plot_legend,
         ),
+        rrb.TimeSeriesView(
+            contents=[
+                f"motion/{motion_group}/manipulability/**",
+                f"motion/{motion_group}/singularity_proximity/**",
+            ],
+            name="Singularity",
+            time_ranges=time_ranges,
+            plot_legend=plot_legend,
+        ),
         name="TCP",
     )
 
@@ -2,13 +2,17 @@ from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import rerun as rr
-import trimesh
 from nova.api import models
 from scipy.spatial.transform import Rotation
 
 from nova_rerun_bridge import colors
 from nova_rerun_bridge.conversion_helpers import normalize_pose
-from nova_rerun_bridge.hull_visualizer import HullVisualizer
+from nova_rerun_bridge.primitives import (
+    capsule_outlines,
+    hull_mesh,
+    hull_outlines,
+    transform_outlines,
+)
 
 
 def log_collision_scenes(collision_scenes: Dict[str, models.CollisionScene]):
@@ -56,13 +60,7 @@ def log_colliders_once(entity_path: str, colliders: Dict[str, models.Collider]):
             height = collider.shape.actual_instance.cylinder_height
             radius = collider.shape.actual_instance.radius
 
-            # Generate trimesh capsule
-            capsule = trimesh.creation.capsule(height=height, radius=radius, count=[6, 8])
-
-            # Extract vertices and faces for solid visualization
-            vertices = np.array(capsule.vertices)
-
-            # Transform vertices to world position
+            # Transform the cached capsule outlines to the collider position
             transform = np.eye(4)
             transform[:3, 3] = [pose.position.x, pose.position.y, pose.position.z - height / 2]
             rot_mat = Rotation.from_rotvec(
@@ -70,40 +68,32 @@ def log_colliders_once(entity_path: str, colliders: Dict[str, models.Collider]):
             )
             transform[:3, :3] = rot_mat.as_matrix()
 
-            vertices = np.array([transform @ np.append(v, 1) for v in vertices])[:, :3]
-
-            polygons = HullVisualizer.compute_hull_outlines_from_points(vertices)
+            polygons = transform_outlines(capsule_outlines(radius, height), transform)
 
             if polygons:
-                line_segments = [p.tolist() for p in polygons]
                 rr.log(
                     f"{entity_path}/{collider_id}",
                     rr.LineStrips3D(
-                        line_segments,
-                        radii=rr.Radius.ui_points(0.75),
-                        colors=[[221, 193, 193, 255]],
+                        polygons, radii=rr.Radius.ui_points(0.75), colors=[[221, 193, 193, 255]]
                     ),
                     static=True,
                     timeless=True,
                 )
 
         elif collider.shape.actual_instance.shape_type == "convex_hull":
-            polygons = HullVisualizer.compute_hull_outlines_from_points(
-                collider.shape.actual_instance.vertices
-            )
+            polygons = hull_outlines(collider.shape.actual_instance.vertices)
 
             if polygons:
-                line_segments = [p.tolist() for p in polygons]
                 rr.log(
                     f"{entity_path}/{collider_id}",
                     rr.LineStrips3D(
-                        line_segments, radii=rr.Radius.ui_points(1.5), colors=[colors.colors[2]]
+                        polygons, radii=rr.Radius.ui_points(1.5), colors=[colors.colors[2]]
                     ),
                     static=True,
                     timeless=True,
                 )
 
-                vertices, triangles, normals = HullVisualizer.compute_hull_mesh(polygons)
+                vertices, triangles, normals = hull_mesh(collider.shape.actual_instance.vertices)
 
                 rr.log(
                     f"{entity_path}/{collider_id}",
@@ -2,3 +2,8 @@ SIZE = 10
 RECORDING_INTERVAL = 0.016  # 16ms per point
 SCHEDULE_INTERVAL = 5  # seconds
 TIME_INTERVAL_NAME = f"time_interval_{RECORDING_INTERVAL}"
+SINGULARITY_THRESHOLD = 0.02  # inverse condition number of the Jacobian
+WORKSPACE_MEMORY_BUDGET = 32 * 1024**2  # bytes per forward kinematics chunk of the workspace
+MODEL_CACHE_SIZE = 8  # robot model scenes kept in memory
+MESH_LOD_PROFILES = {"full": None, "medium": 30_000, "low": 8_000}  # triangles per robot model
+PRIMITIVE_CACHE_SIZE = 256  # generated safety and collider meshes kept in memory
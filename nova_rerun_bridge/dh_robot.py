@@ -1,21 +1,177 @@
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
 
 import numpy as np
 from nova.api import models
 
 
+def dh_matrices(theta, cos_alpha, sin_alpha, a, d) -> np.ndarray:
+    """
+    Build homogeneous DH transformation matrices from broadcastable parameter arrays.
+    :param theta: Array of DH angles about the z axis (in radians).
+    :param cos_alpha: Cosine of the DH angles about the x axis.
+    :param sin_alpha: Sine of the DH angles about the x axis.
+    :param a: DH offsets along the x axis.
+    :param d: DH offsets along the z axis.
+    :return: Array of shape theta.shape + (4, 4).
+    """
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    transforms = np.zeros(np.shape(theta) + (4, 4))
+    transforms[..., 0, 0] = cos_theta
+    transforms[..., 0, 1] = -sin_theta * cos_alpha
+    transforms[..., 0, 2] = sin_theta * sin_alpha
+    transforms[..., 0, 3] = a * cos_theta
+    transforms[..., 1, 0] = sin_theta
+    transforms[..., 1, 1] = cos_theta * cos_alpha
+    transforms[..., 1, 2] = -cos_theta * sin_alpha
+    transforms[..., 1, 3] = a * sin_theta
+    transforms[..., 2, 1] = sin_alpha
+    transforms[..., 2, 2] = cos_alpha
+    transforms[..., 2, 3] = d
+    transforms[..., 3, 3] = 1.0
+    return transforms
+
+
+def invert_transforms(transforms: np.ndarray) -> np.ndarray:
+    """Invert a batch of rigid homogeneous transformations of shape (..., 4, 4)."""
+    rotation_t = np.swapaxes(transforms[..., :3, :3], -1, -2)
+    inverse = np.zeros_like(transforms)
+    inverse[..., :3, :3] = rotation_t
+    inverse[..., :3, 3] = -np.einsum("...ij,...j->...i", rotation_t, transforms[..., :3, 3])
+    inverse[..., 3, 3] = 1.0
+    return inverse
+
+
+def patch_dh_parameters(
+    model_from_controller: str, dh_parameters: List[models.DHParameter]
+) -> List[models.DHParameter]:
+    """
+    Get the DH parameters of a robot model, patched for models the controller reports wrongly.
+    :param model_from_controller: The robot model of the motion group.
+    :param dh_parameters: The DH parameters of the optimizer configuration, they stay untouched.
+    :return: A patched copy of the DH parameters.
+    """
+    dh_parameters = [p.model_copy() for p in dh_parameters]
+    if model_from_controller == "Yaskawa_TURN2":
+        dh_parameters[0].a = 0
+        dh_parameters[0].d = 360
+        dh_parameters[0].alpha = np.pi / 2
+        dh_parameters[0].theta = 0
+
+        dh_parameters[1].a = 0
+        dh_parameters[1].d = 0
+        dh_parameters[1].alpha = 0
+        dh_parameters[1].theta = np.pi / 2
+    return dh_parameters
+
+
+class LinkTransformCache:
+    """Bounded LRU cache of link transforms keyed by quantized joint vectors."""
+
+    def __init__(self, max_entries: int = 20_000, tolerance: float = 1e-6):
+        """
+        :param max_entries: Number of joint configurations kept, least recently used are evicted.
+        :param tolerance: Quantization step of the joint values (in radians). Configurations in
+            the same bin share the link transforms of the first one computed.
+        """
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        # Slot in the transforms array per key, ordered from least to most recently used
+        self.slots: OrderedDict[bytes, int] = OrderedDict()
+        self.transforms: Optional[np.ndarray] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def keys(self, joint_values: np.ndarray) -> List[bytes]:
+        quantized = np.ascontiguousarray(np.round(joint_values / self.tolerance), dtype=np.int64)
+        return quantized.view(np.dtype((np.void, quantized.shape[1] * 8))).ravel().tolist()
+
+    def lookup(self, keys: List[bytes]) -> np.ndarray:
+        """
+        Find the cached slots of the keys and mark them as recently used.
+        :return: Array of slot indices, -1 for keys that are not cached.
+        """
+        slots = np.array([self.slots.get(key, -1) for key in keys], dtype=np.int64)
+        for key, slot in zip(keys, slots.tolist()):
+            if slot >= 0:
+                self.slots.move_to_end(key)
+        return slots
+
+    def insert(self, keys: List[bytes], link_transforms: np.ndarray):
+        """Store link transforms of shape (N, L, 4, 4), evicting the least recently used."""
+        if self.transforms is None:
+            self.transforms = np.empty((self.max_entries,) + link_transforms.shape[1:])
+        for key, transforms in zip(keys, link_transforms):
+            if key in self.slots:
+                continue
+            if len(self.slots) < self.max_entries:
+                slot = len(self.slots)
+            else:
+                _, slot = self.slots.popitem(last=False)
+            self.slots[key] = slot
+            self.transforms[slot] = transforms
+
+    def clear(self):
+        self.slots.clear()
+        self.transforms = None
+        self.hits = 0
+        self.misses = 0
+
+
 class DHRobot:
     """A class for handling DH parameters and computing joint positions."""
 
-    def __init__(self, dh_parameters: List[models.DHParameter], mounting: models.PlannerPose):
+    def __init__(
+        self,
+        dh_parameters: List[models.DHParameter],
+        mounting: models.PlannerPose,
+        prismatic_joints: Optional[Sequence[int]] = None,
+    ):
         """
         Initialize the DHRobot with DH parameters and a mounting pose.
         :param dh_parameters: List of DHParameter objects containing all joint configurations.
         :param mounting: PlannerPose object representing the mounting orientation and position.
+        :param prismatic_joints: Indices of the linear joints, e.g. of a track. Their joint values
+            (in mm) move along the z axis (DH offset d) instead of rotating about it.
         """
         self.dh_parameters = dh_parameters
         self.mounting = mounting
 
+        # Compile the DH table into contiguous arrays so FK only evaluates joint-dependent terms
+        self.a = np.ascontiguousarray([p.a or 0.0 for p in dh_parameters], dtype=np.float64)
+        self.d = np.ascontiguousarray([p.d or 0.0 for p in dh_parameters], dtype=np.float64)
+        alpha = np.array([p.alpha or 0.0 for p in dh_parameters], dtype=np.float64)
+        self.cos_alpha = np.ascontiguousarray(np.cos(alpha))
+        self.sin_alpha = np.ascontiguousarray(np.sin(alpha))
+        self.theta_offset = np.ascontiguousarray(
+            [p.theta or 0.0 for p in dh_parameters], dtype=np.float64
+        )
+        self.rotation_sign = np.ascontiguousarray(
+            [-1.0 if p.reverse_rotation_direction else 1.0 for p in dh_parameters], dtype=np.float64
+        )
+        self.prismatic = np.zeros(len(dh_parameters), dtype=bool)
+        self.prismatic[list(prismatic_joints or [])] = True
+        self.mounting_matrix = self.pose_to_matrix(mounting)
+        self.fk_cache: Optional[LinkTransformCache] = None
+
+    def enable_fk_cache(self, max_entries: int = 20_000, tolerance: float = 1e-6):
+        """
+        Memoize the link transforms of recurring joint configurations, e.g. of repeated cycles.
+        :param max_entries: Number of joint configurations kept in the LRU cache.
+        :param tolerance: Quantization step of the joint values (in radians) used as cache key.
+        """
+        self.fk_cache = LinkTransformCache(max_entries, tolerance)
+
+    def disable_fk_cache(self):
+        self.fk_cache = None
+
     def pose_to_matrix(self, pose: models.PlannerPose):
         """
         Convert a PlannerPose (with quaternion orientation) into a 4x4 homogeneous transformation matrix.
@@ -68,57 +224,431 @@ class DHRobot:
 
         return T
 
-    def dh_transform(self, dh_param: models.DHParameter, joint_rotation):
+    def calculate_joint_positions(self, joint_values):
+        """
+        Compute joint positions based on joint values.
+        :param joint_values: Object containing joint rotation values as a list in joint_values.joints.
+        :return: A list of joint positions as [x, y, z].
+        """
+        joint_positions = self.calculate_joint_positions_batch([joint_values.joints])
+        return joint_positions[0].tolist()
+
+    def dh_transforms_batch(self, joint_values: np.ndarray, first_joint: int = 0) -> np.ndarray:
+        """
+        Compute the homogeneous DH transformation matrices for a batch of joint configurations.
+        :param joint_values: Array of shape (N, J) with joint rotation values (in radians), or
+            offsets (in mm) for prismatic joints.
+        :param first_joint: Index of the DH parameter the first column of joint_values belongs to.
+        :return: Array of shape (N, J, 4, 4) with one transformation per sample and joint.
+        """
+        joint_values = np.asarray(joint_values, dtype=np.float64)
+        num_joints = min(len(self.dh_parameters) - first_joint, joint_values.shape[1])
+        joints = slice(first_joint, first_joint + num_joints)
+
+        # Adjust the joint motion based on its direction, shape (N, J)
+        motion = joint_values[:, :num_joints] * self.rotation_sign[joints]
+        if not self.prismatic[joints].any():
+            theta, d = self.theta_offset[joints] + motion, self.d[joints]
+        else:
+            prismatic = self.prismatic[joints]
+            theta = self.theta_offset[joints] + np.where(prismatic, 0.0, motion)
+            d = self.d[joints] + np.where(prismatic, motion, 0.0)
+        return dh_matrices(theta, self.cos_alpha[joints], self.sin_alpha[joints], self.a[joints], d)
+
+    def calculate_link_transforms_batch(
+        self, joint_values: np.ndarray, base_transforms: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Compute the full-frame forward kinematics for a batch of joint configurations.
+        :param joint_values: Array of shape (N, J) with joint rotation values (in radians).
+        :param base_transforms: Optional per-sample frame of shape (N, 4, 4) or (4, 4) the mounting
+            is relative to, e.g. the flange of a carrying motion group. Defaults to the world frame.
+        :return: Array of shape (N, J+1, 4, 4) with the mounting frame followed by every link frame.
+        """
+        joint_values = np.atleast_2d(np.asarray(joint_values, dtype=np.float64))
+        if self.fk_cache is not None and base_transforms is None:
+            return self._cached_link_transforms(joint_values)
+        return self._link_transforms(joint_values, base_transforms)
+
+    def _cached_link_transforms(self, joint_values: np.ndarray) -> np.ndarray:
+        cache = self.fk_cache
+        keys = cache.keys(joint_values[:, : len(self.dh_parameters)])
+        slots = cache.lookup(keys)
+
+        hits = slots >= 0
+        cache.hits += int(np.count_nonzero(hits))
+        cache.misses += len(keys) - int(np.count_nonzero(hits))
+
+        if hits.all() and len(keys) > 0:
+            return cache.transforms[slots]
+
+        missing = np.flatnonzero(~hits)
+        computed = self._link_transforms(joint_values[missing])
+        link_transforms = np.empty((len(keys),) + computed.shape[1:])
+        link_transforms[missing] = computed
+        if hits.any():
+            # Gather the hits before inserting, insertion may evict their slots
+            link_transforms[hits] = cache.transforms[slots[hits]]
+        cache.insert([keys[i] for i in missing], computed)
+        return link_transforms
+
+    def _link_transforms(
+        self, joint_values: np.ndarray, base_transforms: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        transforms = self.dh_transforms_batch(joint_values)
+        num_samples, num_joints = transforms.shape[:2]
+
+        link_transforms = np.empty((num_samples, num_joints + 1, 4, 4))
+
+        # Incorporate the mounting pose at the start
+        if base_transforms is None:
+            link_transforms[:, 0] = self.mounting_matrix
+        else:
+            base_transforms = np.broadcast_to(base_transforms, (num_samples, 4, 4))
+            np.matmul(base_transforms, self.mounting_matrix, out=link_transforms[:, 0])
+        for i in range(num_joints):
+            np.matmul(link_transforms[:, i], transforms[:, i], out=link_transforms[:, i + 1])
+
+        return link_transforms
+
+    def calculate_joint_positions_batch(self, joint_values: np.ndarray) -> np.ndarray:
+        """
+        Compute joint positions for a batch of joint configurations in one pass.
+        :param joint_values: Array of shape (N, J) with joint rotation values (in radians).
+        :return: Array of shape (N, J+1, 3) with the mounting position followed by all joint positions.
+        """
+        return self.calculate_link_transforms_batch(joint_values)[:, :, :3, 3]
+
+    def calculate_jacobian_batch(
+        self, link_transforms: np.ndarray, tcp_offset: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Compute the geometric Jacobian for a batch of link frames.
+        :param link_transforms: Array of shape (N, J+1, 4, 4) from calculate_link_transforms_batch.
+        :param tcp_offset: Optional 4x4 transformation from the flange to the TCP.
+        :return: Array of shape (N, 6, J) mapping joint velocities [rad/s, mm/s for prismatic
+            joints] to the linear [mm/s] and angular [rad/s] velocity of the TCP (or the flange if
+            no offset is given).
+        """
+        link_transforms = np.asarray(link_transforms, dtype=np.float64)
+        num_joints = link_transforms.shape[1] - 1
+
+        end_effector = link_transforms[:, -1]
+        if tcp_offset is not None:
+            end_effector = end_effector @ tcp_offset
+
+        # Joint i rotates about (or slides along) the z axis of link frame i
+        axes = link_transforms[:, :-1, :3, 2] * self.rotation_sign[:num_joints, None]
+        origins = link_transforms[:, :-1, :3, 3]
+
+        jacobian = np.empty((len(link_transforms), 6, num_joints))
+        jacobian[:, :3] = np.cross(axes, end_effector[:, None, :3, 3] - origins).transpose(0, 2, 1)
+        jacobian[:, 3:] = axes.transpose(0, 2, 1)
+
+        prismatic = self.prismatic[:num_joints]
+        jacobian[:, :3, prismatic] = jacobian[:, 3:, prismatic]
+        jacobian[:, 3:, prismatic] = 0.0
+        return jacobian
+
+    def calculate_inverse_kinematics_batch(
+        self,
+        target_poses: np.ndarray,
+        tcp_offset: Optional[np.ndarray] = None,
+        joint_limits: Optional[np.ndarray] = None,
+        tolerance: float = 1e-3,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute all closed-form inverse kinematics solutions for a batch of target poses.
+        Supported are 6-axis robots with a spherical wrist (industrial offset wrist) and
+        UR-style robots with three parallel middle axes.
+        :param target_poses: Array of shape (N, 4, 4) with the TCP target poses in world coordinates.
+        :param tcp_offset: Optional 4x4 transformation from the flange to the TCP.
+        :param joint_limits: Optional array of shape (J, 2) with lower and upper joint limits.
+        :param tolerance: Maximum position error [mm] of a valid solution.
+        :return: Tuple of the joint solutions of shape (N, 8, J) and a validity mask of shape (N, 8).
+        :raises ValueError: If there is no closed-form solution for the DH parameters.
+        """
+        target_poses = np.asarray(target_poses, dtype=np.float64).reshape(-1, 4, 4)
+        flange_poses = (
+            target_poses if tcp_offset is None else target_poses @ invert_transforms(tcp_offset)
+        )
+        flange = invert_transforms(self.mounting_matrix) @ flange_poses
+
+        if self.prismatic.any():
+            raise ValueError("No closed-form inverse kinematics for prismatic joints")
+        elif len(self.dh_parameters) == 6 and self.has_spherical_wrist():
+            theta = self._spherical_wrist_inverse_kinematics(flange)
+        elif len(self.dh_parameters) == 6 and self.has_parallel_middle_axes():
+            theta = self._parallel_axes_inverse_kinematics(flange)
+        else:
+            raise ValueError("No closed-form inverse kinematics for these DH parameters")
+
+        # Convert the DH angles back to joint values in (-pi, pi]
+        joint_values = (theta - self.theta_offset) * self.rotation_sign
+        joint_values = np.pi - np.mod(np.pi - joint_values, 2 * np.pi)
+
+        if joint_limits is not None:
+            joint_limits = np.asarray(joint_limits, dtype=np.float64)
+            # Shift by full turns towards the center of the joint range
+            center = joint_limits.mean(axis=1)
+            joint_values += 2 * np.pi * np.round((center - joint_values) / (2 * np.pi))
+
+        # Keep only solutions that actually reach the target
+        num_samples, num_solutions = joint_values.shape[:2]
+        with np.errstate(invalid="ignore"):
+            reached = self.calculate_link_transforms_batch(joint_values.reshape(-1, 6))[:, -1]
+        reached = reached.reshape(num_samples, num_solutions, 4, 4)
+        position_error = np.linalg.norm(reached[..., :3, 3] - flange_poses[:, None, :3, 3], axis=-1)
+        rotation_error = np.linalg.norm(
+            reached[..., :3, :3] - flange_poses[:, None, :3, :3], axis=(-2, -1)
+        )
+        valid = (position_error < tolerance) & (rotation_error < 1e-4)
+
+        if joint_limits is not None:
+            valid &= np.all(
+                (joint_values >= joint_limits[:, 0]) & (joint_values <= joint_limits[:, 1]), axis=-1
+            )
+
+        return joint_values, valid
+
+    def has_spherical_wrist(self, eps: float = 1e-6) -> bool:
+        """Check if the last three axes intersect and the first axes allow a closed-form solution."""
+        return (
+            abs(self.cos_alpha[0]) < eps
+            and abs(self.sin_alpha[1]) < eps
+            and self.cos_alpha[1] > 0
+            and abs(self.cos_alpha[3]) < eps
+            and abs(self.cos_alpha[4]) < eps
+            and np.all(np.abs(self.a[3:]) < eps)
+            and abs(self.d[4]) < eps
+        )
+
+    def has_parallel_middle_axes(self, eps: float = 1e-6) -> bool:
+        """Check for UR-style kinematics with axes 2, 3 and 4 parallel."""
+        return (
+            abs(self.cos_alpha[0]) < eps
+            and np.all(np.abs(self.sin_alpha[1:3]) < eps)
+            and np.all(self.cos_alpha[1:3] > 0)
+            and abs(self.cos_alpha[3]) < eps
+            and abs(self.cos_alpha[4]) < eps
+            and np.all(np.abs(self.a[3:]) < eps)
+        )
+
+    def _wrist_point_and_first_axis(self, flange: np.ndarray, offset: float):
         """
-        Compute the homogeneous transformation matrix for a given DH parameter and joint rotation.
-        :param dh_param: A single DH parameter.
-        :param joint_rotation: The joint rotation value (in radians).
-        :return: A 4x4 homogeneous transformation matrix.
+        Compute the wrist point (origin of link frame 5) and the two solutions for the first axis.
+        :param flange: Flange poses of shape (N, 4, 4) relative to the robot base.
+        :param offset: Distance of the wrist point from the plane of the arm along the axis of joint 2.
+        :return: Tuple of the wrist points (N, 3) and the DH angles of joint 1 (N, 2).
         """
-        # Adjust the angle based on rotation direction
-        theta = dh_param.theta + joint_rotation * (-1 if dh_param.reverse_rotation_direction else 1)
-        d = dh_param.d
-        a = dh_param.a
-        alpha = dh_param.alpha
+        # Axis of joint 6 expressed through the flange orientation
+        axis_6 = flange[:, :3, :3] @ np.array([0.0, self.sin_alpha[5], self.cos_alpha[5]])
+        wrist = flange[:, :3, 3] - self.d[5] * axis_6
+
+        radius = np.hypot(wrist[:, 0], wrist[:, 1])
+        phi = np.arctan2(wrist[:, 1], wrist[:, 0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shoulder = np.arcsin(np.clip(-offset * self.sin_alpha[0] / radius, -1.0, 1.0))
+        shoulder = np.nan_to_num(shoulder)
+        theta_1 = np.stack([phi - shoulder, phi - np.pi + shoulder], axis=1)
+        return wrist, theta_1
+
+    def _first_link(self, theta_1: np.ndarray) -> np.ndarray:
+        return dh_matrices(theta_1, self.cos_alpha[0], self.sin_alpha[0], self.a[0], self.d[0])
+
+    def _spherical_wrist_inverse_kinematics(self, flange: np.ndarray) -> np.ndarray:
+        """Solve the DH angles for a spherical wrist robot, returns shape (N, 8, 6)."""
+        ca, sa, a, d = self.cos_alpha, self.sin_alpha, self.a, self.d
+        num_samples = len(flange)
+
+        wrist, theta_1 = self._wrist_point_and_first_axis(flange, d[1] + d[2] + d[3] * ca[2])
+
+        # Wrist point in the frame of link 1, shape (N, 2, 3)
+        link_1 = self._first_link(theta_1)
+        wrist_1 = np.einsum("nsij,nj->nsi", invert_transforms(link_1)[..., :3, :3], wrist)
+        wrist_1 += invert_transforms(link_1)[..., :3, 3]
+
+        # Planar elbow: link 2 of length a2 and forearm (a3, -sin(alpha3) * d4), shape (N, 2, 2)
+        forearm_y = -sa[2] * d[3]
+        forearm = np.hypot(a[2], forearm_y)
+        forearm_angle = np.arctan2(forearm_y, a[2])
+        x, y = wrist_1[..., 0], wrist_1[..., 1]
+        cos_elbow = (x**2 + y**2 - a[1] ** 2 - forearm**2) / (2 * a[1] * forearm)
+        elbow = np.arccos(np.clip(cos_elbow, -1.0, 1.0))
+        elbow = np.stack([elbow, -elbow], axis=2)
+        theta_3 = elbow - forearm_angle
+        theta_2 = np.arctan2(y, x)[..., None] - np.arctan2(
+            forearm * np.sin(elbow), a[1] + forearm * np.cos(elbow)
+        )
+        theta_1 = np.broadcast_to(theta_1[..., None], theta_2.shape)
+
+        # Remaining wrist rotation M = Rz(t4) Rx(a4) Rz(t5) Rx(a5) Rz(t6)
+        arm = (
+            self._first_link(theta_1)
+            @ dh_matrices(theta_2, ca[1], sa[1], a[1], d[1])
+            @ dh_matrices(theta_3, ca[2], sa[2], a[2], d[2])
+        )
+        rotation_x_6 = dh_matrices(0.0, ca[5], sa[5], 0.0, 0.0)[:3, :3]
+        wrist_rotation = (
+            np.swapaxes(arm[..., :3, :3], -1, -2) @ flange[:, None, None, :3, :3] @ rotation_x_6.T
+        )
+
+        s4, s5 = sa[3], sa[4]
+        sin_5 = np.hypot(wrist_rotation[..., 0, 2], wrist_rotation[..., 1, 2])
+        sin_5 = np.stack([sin_5, -sin_5], axis=3)
+        cos_5 = np.broadcast_to((-s4 * s5 * wrist_rotation[..., 2, 2])[..., None], sin_5.shape)
+        theta_5 = np.arctan2(sin_5, cos_5)
+
+        sign = s5 * np.sign(sin_5)
+        theta_4 = np.where(
+            np.abs(sin_5) > 1e-9,
+            np.arctan2(
+                sign * wrist_rotation[..., 1, 2, None], sign * wrist_rotation[..., 0, 2, None]
+            ),
+            0.0,
+        )
+        # Whatever rotation is left over belongs to joint 6
+        partial = dh_matrices(theta_4, ca[3], sa[3], 0.0, 0.0) @ dh_matrices(
+            theta_5, ca[4], sa[4], 0.0, 0.0
+        )
+        rest = np.swapaxes(partial[..., :3, :3], -1, -2) @ wrist_rotation[..., None, :, :]
+        theta_6 = np.arctan2(rest[..., 1, 0], rest[..., 0, 0])
 
-        # Create the homogeneous transformation matrix for this DH parameter
-        transformation = np.array(
+        theta = np.stack(
             [
-                [
-                    np.cos(theta),
-                    -np.sin(theta) * np.cos(alpha),
-                    np.sin(theta) * np.sin(alpha),
-                    a * np.cos(theta),
-                ],
-                [
-                    np.sin(theta),
-                    np.cos(theta) * np.cos(alpha),
-                    -np.cos(theta) * np.sin(alpha),
-                    a * np.sin(theta),
-                ],
-                [0, np.sin(alpha), np.cos(alpha), d],
-                [0, 0, 0, 1],
-            ]
+                np.broadcast_to(theta_1[..., None], theta_4.shape),
+                np.broadcast_to(theta_2[..., None], theta_4.shape),
+                np.broadcast_to(theta_3[..., None], theta_4.shape),
+                theta_4,
+                theta_5,
+                theta_6,
+            ],
+            axis=-1,
         )
-        return transformation
+        return theta.reshape(num_samples, 8, 6)
 
-    def calculate_joint_positions(self, joint_values):
+    def _parallel_axes_inverse_kinematics(self, flange: np.ndarray) -> np.ndarray:
+        """Solve the DH angles for a UR-style robot, returns shape (N, 8, 6)."""
+        ca, sa, a, d = self.cos_alpha, self.sin_alpha, self.a, self.d
+        num_samples = len(flange)
+
+        _, theta_1 = self._wrist_point_and_first_axis(flange, d[1] + d[2] + d[3] + d[4] * ca[3])
+        link_1 = self._first_link(theta_1)
+        axis_1 = link_1[..., :3, 2]
+
+        # Angle between the axes of joint 2 and joint 6 fixes joint 5, shape (N, 2, 2)
+        s4, s5 = sa[3], sa[4]
+        rotation_x_6 = dh_matrices(0.0, ca[5], sa[5], 0.0, 0.0)[:3, :3]
+        frame_6 = flange[:, :3, :3] @ rotation_x_6.T
+        cos_5 = -s4 * s5 * np.einsum("nk,nsk->ns", frame_6[:, :, 2], axis_1)
+        theta_5 = np.arccos(np.clip(cos_5, -1.0, 1.0))
+        theta_5 = np.stack([theta_5, -theta_5], axis=2)
+        sin_5 = np.sin(theta_5)
+
+        u = np.einsum("nk,nsk->ns", frame_6[:, :, 0], axis_1)[..., None]
+        v = np.einsum("nk,nsk->ns", frame_6[:, :, 1], axis_1)[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            theta_6 = np.where(
+                np.abs(sin_5) > 1e-9, np.arctan2(-v / (s4 * sin_5), u / (s4 * sin_5)), 0.0
+            )
+        theta_1 = np.broadcast_to(theta_1[..., None], theta_5.shape)
+
+        # Frame of link 4 relative to link 1
+        link_4 = (
+            invert_transforms(self._first_link(theta_1))
+            @ flange[:, None, None]
+            @ invert_transforms(dh_matrices(theta_6, ca[5], sa[5], a[5], d[5]))
+            @ invert_transforms(dh_matrices(theta_5, ca[4], sa[4], a[4], d[4]))
+        )
+
+        # Planar elbow with link lengths a2 and a3, shape (N, 2, 2, 2)
+        x, y = link_4[..., 0, 3], link_4[..., 1, 3]
+        cos_elbow = (x**2 + y**2 - a[1] ** 2 - a[2] ** 2) / (2 * a[1] * a[2])
+        theta_3 = np.arccos(np.clip(cos_elbow, -1.0, 1.0))
+        theta_3 = np.stack([theta_3, -theta_3], axis=3)
+        theta_2 = np.arctan2(y, x)[..., None] - np.arctan2(
+            a[2] * np.sin(theta_3), a[1] + a[2] * np.cos(theta_3)
+        )
+        theta_234 = np.arctan2(link_4[..., 1, 0], link_4[..., 0, 0])[..., None]
+        theta_4 = theta_234 - theta_2 - theta_3
+
+        theta = np.stack(
+            [
+                np.broadcast_to(theta_1[..., None], theta_2.shape),
+                theta_2,
+                theta_3,
+                theta_4,
+                np.broadcast_to(theta_5[..., None], theta_2.shape),
+                np.broadcast_to(theta_6[..., None], theta_2.shape),
+            ],
+            axis=-1,
+        )
+        return theta.reshape(num_samples, 8, 6)
+
+    def update_link_transforms(
+        self,
+        joint_values: np.ndarray,
+        previous_joint_values: Optional[np.ndarray] = None,
+        previous_link_transforms: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, int]:
         """
-        Compute joint positions based on joint values.
-        :param joint_values: Object containing joint rotation values as a list in joint_values.joints.
-        :return: A list of joint positions as [x, y, z].
+        Incrementally recompute the link frames of a single joint configuration.
+        Frames before the first changed joint are reused from the previous result.
+        :param joint_values: Array of shape (J,) with the current joint rotation values (in radians).
+        :param previous_joint_values: Joint values the previous link transforms were computed for.
+        :param previous_link_transforms: Previous result of shape (J+1, 4, 4).
+        :return: Tuple of the link transforms of shape (J+1, 4, 4) and the index of the first
+            link frame that changed (J+1 if nothing changed).
         """
-        # Incorporate the mounting pose at the start
-        accumulated_matrix = self.pose_to_matrix(self.mounting)
+        joint_values = np.asarray(joint_values, dtype=np.float64)[: len(self.dh_parameters)]
+        num_links = len(joint_values) + 1
+
+        if previous_joint_values is None or previous_link_transforms is None:
+            return self.calculate_link_transforms_batch(joint_values[None])[0], 0
+
+        previous_joint_values = np.asarray(previous_joint_values)[: len(self.dh_parameters)]
+        if len(previous_joint_values) != len(joint_values):
+            return self.calculate_link_transforms_batch(joint_values[None])[0], 0
+
+        changed = np.flatnonzero(joint_values != previous_joint_values)
+        if len(changed) == 0:
+            return previous_link_transforms, num_links
+
+        # Joint i moves link frame i+1 and everything after it
+        first_joint = int(changed[0])
+        transforms = self.dh_transforms_batch(joint_values[None, first_joint:], first_joint)
+        link_transforms = previous_link_transforms.copy()
+        for i in range(first_joint, len(joint_values)):
+            link_transforms[i + 1] = link_transforms[i] @ transforms[0, i - first_joint]
 
-        joint_positions = [
-            accumulated_matrix[:3, 3].tolist()
-        ]  # Base position after mounting is applied
+        return link_transforms, first_joint + 1
 
-        for dh_param, joint_rotation in zip(self.dh_parameters, joint_values.joints):
-            transform = self.dh_transform(dh_param, joint_rotation)
-            accumulated_matrix = accumulated_matrix @ transform
-            position = accumulated_matrix[:3, 3]  # Extract translation (x, y, z)
-            joint_positions.append(position.tolist())
 
-        return joint_positions
+class CompositeDHRobot:
+    """A robot carried by another motion group, e.g. on a linear track or a turntable."""
+
+    def __init__(self, carrier: DHRobot, robot: DHRobot):
+        """
+        Chain two motion groups, the mounting of the robot is relative to the carrier's flange.
+        :param carrier: DHRobot of the carrying motion group (external axes), the axes of a
+            linear track have to be declared as prismatic joints.
+        :param robot: DHRobot of the carried motion group.
+        """
+        self.carrier = carrier
+        self.robot = robot
+
+    def calculate_link_transforms_batch(
+        self, carrier_joint_values: np.ndarray, joint_values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the forward kinematics of carrier and robot for a batch of synchronized samples.
+        :param carrier_joint_values: Array of shape (N, Jc) with the carrier joint values.
+        :param joint_values: Array of shape (N, J) with the robot joint values.
+        :return: Tuple of the carrier link frames of shape (N, Jc+1, 4, 4) and the robot link
+            frames of shape (N, J+1, 4, 4), both in world coordinates.
+        """
+        carrier_link_transforms = self.carrier.calculate_link_transforms_batch(carrier_joint_values)
+        link_transforms = self.robot.calculate_link_transforms_batch(
+            joint_values, base_transforms=carrier_link_transforms[:, -1]
+        )
+        return carrier_link_transforms, link_transforms
@@ -7,10 +7,14 @@ from scipy.spatial import ConvexHull
 
 class HullVisualizer:
     @staticmethod
-    def compute_hull_mesh(
-        polygons: List[np.ndarray],
-    ) -> Tuple[List[List[float]], List[List[int]], List[List[float]]]:
-        """Convert polygons to mesh with optimized hull generation."""
+    def compute_hull_mesh(polygons: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert polygons to mesh with optimized hull generation.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Contiguous float32 vertices, uint32
+                triangle indices and float32 vertex normals that can be passed to Rerun as is.
+        """
         vertices = np.vstack(polygons)
 
         # Custom qhull options for better quality
@@ -25,7 +29,11 @@ class HullVisualizer:
 
         mesh = trimesh.convex.convex_hull(vertices, qhull_options=qhull_opts, repair=True)
 
-        return (mesh.vertices.tolist(), mesh.faces.tolist(), mesh.vertex_normals.tolist())
+        return (
+            np.ascontiguousarray(mesh.vertices, dtype=np.float32),
+            np.ascontiguousarray(mesh.faces, dtype=np.uint32),
+            np.ascontiguousarray(mesh.vertex_normals, dtype=np.float32),
+        )
 
     @staticmethod
     def plane_from_triangle(p0, p1, p2, normal_epsilon=1e-6):
@@ -0,0 +1,627 @@
+import json
+import os
+import re
+import shutil
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import rerun as rr
+import trimesh
+from loguru import logger
+
+from nova_rerun_bridge.consts import MESH_LOD_PROFILES, MODEL_CACHE_SIZE
+from nova_rerun_bridge.helper_scripts.download_models import get_project_root
+
+# Loaded GLB scenes per (model name, file modification time, LOD profile), least recently used first
+_scenes: "OrderedDict[Tuple[str, float, str], trimesh.Scene]" = OrderedDict()
+
+# Preprocessed robot models per (model name, file modification time, LOD profile)
+_models: "OrderedDict[Tuple[str, int, str], RobotModel]" = OrderedDict()
+
+# Joint names, mesh nodes per joint and link node per mesh node of a model, see discover_joints
+JointStructure = Tuple[List[str], Dict[str, List[str]], Dict[str, str]]
+
+# Joint structure per (model name, file modification time), shared by all LOD profiles
+_joint_structures: Dict[Tuple[str, int], JointStructure] = {}
+
+# Version of the preprocessed model layout, cached models of other versions are rebuilt
+PREPROCESSED_MODEL_VERSION = 1
+
+# Mesh LOD profile per recording, recordings without an entry use "full"
+_recording_lods: Dict[str, str] = {}
+
+
+def get_model_path(model_name: str) -> str:
+    """Get absolute path to model file in project directory"""
+    return str(get_project_root() / "models" / f"{model_name}.glb")
+
+
+def get_lod_path(model_name: str, lod: str) -> str:
+    """Get the path of the decimated meshes of a model, stored next to the model file."""
+    return str(get_project_root() / "models" / f"{model_name}.lod_{lod}.npz")
+
+
+def get_preprocessed_path(model_name: str, lod: str) -> str:
+    """Get the directory of the preprocessed model, stored next to the model file."""
+    return str(get_project_root() / "models" / f"{model_name}.{lod}.preprocessed")
+
+
+def set_mesh_lod(lod: str) -> None:
+    """
+    Select the mesh level of detail of robot models logged to the current recording.
+
+    Raises:
+        ValueError: If lod is not one of MESH_LOD_PROFILES.
+    """
+    if lod not in MESH_LOD_PROFILES:
+        raise ValueError(f"Unknown mesh LOD profile {lod}, use one of {list(MESH_LOD_PROFILES)}")
+    _recording_lods[rr.get_recording_id()] = lod
+
+
+def get_mesh_lod() -> str:
+    """Get the mesh level of detail of the current recording."""
+    return _recording_lods.get(rr.get_recording_id(), "full")
+
+
+def load_model_scene(model_name: str, lod: str = "full") -> trimesh.Scene:
+    """
+    Load the GLB scene of a robot model, shared by all visualizers of the process.
+
+    The scene is parsed once per model file and reloaded when the file changes on disk. The
+    returned scene is shared and must be treated as read-only, copy geometries before modifying.
+
+    Args:
+        model_name: Name of the model file in the models directory.
+        lod: Mesh level of detail, one of MESH_LOD_PROFILES. Decimated meshes are computed once
+            and cached on disk next to the model.
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
+        ValueError: If lod is not one of MESH_LOD_PROFILES.
+    """
+    if lod not in MESH_LOD_PROFILES:
+        raise ValueError(f"Unknown mesh LOD profile {lod}, use one of {list(MESH_LOD_PROFILES)}")
+
+    glb_path = get_model_path(model_name)
+    key = (model_name, os.path.getmtime(glb_path), lod)
+
+    scene = _scenes.get(key)
+    if scene is not None:
+        _scenes.move_to_end(key)
+        return scene
+
+    if MESH_LOD_PROFILES[lod] is None:
+        scene = trimesh.load(glb_path, file_type="glb")
+    else:
+        scene = decimate_scene(
+            load_model_scene(model_name), MESH_LOD_PROFILES[lod], get_lod_path(model_name, lod)
+        )
+
+    # Drop outdated versions of the model before the least recently used ones
+    for cached_key in [k for k in _scenes if k[0] == model_name and k[2] == lod]:
+        del _scenes[cached_key]
+    _scenes[key] = scene
+    while len(_scenes) > MODEL_CACHE_SIZE:
+        _scenes.popitem(last=False)
+
+    return scene
+
+
+def clear_model_cache():
+    """Drop all cached model scenes, e.g. after downloading new models."""
+    _scenes.clear()
+    _models.clear()
+    _joint_structures.clear()
+
+
+class RobotModel:
+    """
+    The link meshes of a robot model in mm together with the joint structure of its scene.
+
+    Mesh buffers of all nodes are stored in shared arrays, which are read-only memory maps when
+    the model was loaded from its preprocessed directory.
+    """
+
+    def __init__(
+        self,
+        joint_names: List[str],
+        layer_nodes: Dict[str, List[str]],
+        parent_nodes: Dict[str, str],
+        joint_transforms: np.ndarray,
+        mesh_nodes: List[Tuple[str, str]],
+        vertex_ranges: np.ndarray,
+        face_ranges: np.ndarray,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        normals: np.ndarray,
+        colors: np.ndarray,
+    ):
+        """
+        :param joint_names: Joint nodes of the scene ordered by link index.
+        :param layer_nodes: Mesh nodes moving with each joint.
+        :param parent_nodes: Link node of each mesh node.
+        :param joint_transforms: Array of shape (J, 4, 4), per joint the inverse of its scene
+            transform with the translation in mm.
+        :param mesh_nodes: (joint name, node name) of each mesh.
+        :param vertex_ranges: Array of shape (M, 2) with the vertex range of each mesh.
+        :param face_ranges: Array of shape (M, 2) with the triangle range of each mesh.
+        :param vertices: Vertices (V, 3) of all meshes in their link frame in mm.
+        :param faces: Triangles (F, 3) of all meshes, indexing the vertices of their mesh.
+        :param normals: Vertex normals (V, 3) of all meshes.
+        :param colors: Main RGBA color (M, 4) of each mesh.
+        """
+        self.joint_names = joint_names
+        self.layer_nodes = layer_nodes
+        self.parent_nodes = parent_nodes
+        self.joint_transforms = joint_transforms
+        self.mesh_nodes = mesh_nodes
+        self.vertex_ranges = vertex_ranges
+        self.face_ranges = face_ranges
+        self.vertices = vertices
+        self.faces = faces
+        self.normals = normals
+        self.colors = colors
+        self._mesh_indices = {key: i for i, key in enumerate(mesh_nodes)}
+
+    def joint_transform(self, joint_name: str) -> np.ndarray:
+        """Get the inverse scene transform of a joint with the translation in mm."""
+        return self.joint_transforms[self.joint_names.index(joint_name)]
+
+    def has_mesh(self, joint_name: str, node_name: str) -> bool:
+        return (joint_name, node_name) in self._mesh_indices
+
+    def mesh_buffers(
+        self, joint_name: str, node_name: str
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Get the buffers of a mesh node in its link frame, views into the shared arrays.
+
+        Returns:
+            Tuple of vertices, triangle indices, vertex normals and main color or None if the
+            node is no mesh of the joint.
+        """
+        index = self._mesh_indices.get((joint_name, node_name))
+        if index is None:
+            return None
+        vertex_start, vertex_stop = self.vertex_ranges[index]
+        face_start, face_stop = self.face_ranges[index]
+        return (
+            self.vertices[vertex_start:vertex_stop],
+            self.faces[face_start:face_stop],
+            self.normals[vertex_start:vertex_stop],
+            self.colors[index],
+        )
+
+
+def load_robot_model(model_name: str, lod: str = "full") -> RobotModel:
+    """
+    Load the preprocessed meshes and joint structure of a robot model.
+
+    The model is preprocessed from its GLB scene once and stored next to the model file as
+    .npy arrays and a manifest. Later loads memory map the arrays and skip parsing the GLB.
+    The directory is rebuilt when the model file, the LOD budget or the layout version changed.
+
+    Args:
+        model_name: Name of the model file in the models directory.
+        lod: Mesh level of detail, one of MESH_LOD_PROFILES.
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
+        ValueError: If lod is not one of MESH_LOD_PROFILES.
+    """
+    if lod not in MESH_LOD_PROFILES:
+        raise ValueError(f"Unknown mesh LOD profile {lod}, use one of {list(MESH_LOD_PROFILES)}")
+
+    stat = os.stat(get_model_path(model_name))
+    key = (model_name, stat.st_mtime_ns, lod)
+
+    model = _models.get(key)
+    if model is not None:
+        _models.move_to_end(key)
+        return model
+
+    source = {
+        "version": PREPROCESSED_MODEL_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "triangle_budget": MESH_LOD_PROFILES[lod],
+    }
+    path = get_preprocessed_path(model_name, lod)
+    model = read_preprocessed_model(path, source)
+    if model is None:
+        model = preprocess_scene(
+            load_model_scene(model_name, lod), load_joint_structure(model_name)
+        )
+        write_preprocessed_model(path, model, source)
+
+    for cached_key in [k for k in _models if k[0] == model_name and k[2] == lod]:
+        del _models[cached_key]
+    _models[key] = model
+    while len(_models) > MODEL_CACHE_SIZE:
+        _models.popitem(last=False)
+
+    return model
+
+
+_MODEL_ARRAYS = (
+    "joint_transforms",
+    "vertex_ranges",
+    "face_ranges",
+    "vertices",
+    "faces",
+    "normals",
+    "colors",
+)
+
+
+def read_preprocessed_model(path: str, source: dict) -> Optional[RobotModel]:
+    """Memory map a preprocessed model, None if it is missing or was built from another source."""
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("source") != source:
+            return None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in _MODEL_ARRAYS
+        }
+        return RobotModel(
+            joint_names=manifest["joint_names"],
+            layer_nodes=manifest["layer_nodes"],
+            parent_nodes=manifest["parent_nodes"],
+            mesh_nodes=[tuple(key) for key in manifest["mesh_nodes"]],
+            **arrays,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable preprocessed model {path}: {e}")
+        return None
+
+
+def write_preprocessed_model(path: str, model: RobotModel, source: dict):
+    """Store a preprocessed model as .npy arrays and a JSON manifest in a directory."""
+    # Write atomically, visualizers of other processes may read the directory concurrently
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(temporary_path, exist_ok=True)
+        for name in _MODEL_ARRAYS:
+            np.save(os.path.join(temporary_path, f"{name}.npy"), getattr(model, name))
+        manifest = {
+            "source": source,
+            "joint_names": model.joint_names,
+            "layer_nodes": model.layer_nodes,
+            "parent_nodes": model.parent_nodes,
+            "mesh_nodes": model.mesh_nodes,
+        }
+        with open(os.path.join(temporary_path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        # Processes mapping the outdated arrays keep reading their unlinked files
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.warning(f"Cannot store preprocessed model at {path}: {e}")
+        shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def load_joint_structure(model_name: str) -> JointStructure:
+    """
+    Discover the joints of a robot model once per model file, see discover_joints.
+    The result is shared and must be treated as read-only.
+    """
+    key = (model_name, os.stat(get_model_path(model_name)).st_mtime_ns)
+    structure = _joint_structures.get(key)
+    if structure is None:
+        structure = discover_joints(load_model_scene(model_name).graph.transforms.edge_data)
+        for cached_key in [k for k in _joint_structures if k[0] == model_name]:
+            del _joint_structures[cached_key]
+        _joint_structures[key] = structure
+    return structure
+
+
+def preprocess_scene(
+    scene: trimesh.Scene, joint_structure: Optional[JointStructure] = None
+) -> RobotModel:
+    """
+    Extract the joint structure of a model scene and transform its mesh nodes into their link
+    frames in mm.
+
+    Args:
+        scene: The model scene.
+        joint_structure: The result of discover_joints for the scene graph, discovered if not
+            given.
+    """
+    if joint_structure is None:
+        joint_structure = discover_joints(scene.graph.transforms.edge_data)
+    joint_names, layer_nodes, parent_nodes = joint_structure
+
+    joint_transforms = np.zeros((len(joint_names), 4, 4))
+    for i, joint_name in enumerate(joint_names):
+        # calculate the inverse transform to get the mesh in the correct position
+        cumulative_transform, _ = scene.graph.get(frame_to=joint_name)
+        joint_transforms[i] = np.linalg.inv(cumulative_transform)
+        # scale positions to mm
+        joint_transforms[i, :3, 3] *= 1000
+
+    mesh_nodes, buffers = [], []
+    for joint_name in joint_names:
+        for node_name in layer_nodes.get(joint_name, []):
+            if node_name in scene.geometry and node_name in parent_nodes:
+                mesh_nodes.append((joint_name, node_name))
+                buffers.append(
+                    _link_mesh_buffers(
+                        scene, scene.geometry[node_name], joint_name, parent_nodes[node_name]
+                    )
+                )
+
+    vertex_counts = [len(b[0]) for b in buffers]
+    face_counts = [len(b[1]) for b in buffers]
+    vertex_stops, face_stops = np.cumsum(vertex_counts, dtype=np.int64), np.cumsum(face_counts)
+    return RobotModel(
+        joint_names=joint_names,
+        layer_nodes=layer_nodes,
+        parent_nodes=parent_nodes,
+        joint_transforms=joint_transforms,
+        mesh_nodes=mesh_nodes,
+        vertex_ranges=np.stack([vertex_stops - vertex_counts, vertex_stops], axis=1).reshape(-1, 2),
+        face_ranges=np.stack([face_stops - face_counts, face_stops], axis=1).reshape(-1, 2),
+        vertices=np.concatenate([b[0] for b in buffers] or [np.zeros((0, 3))]).astype(np.float32),
+        faces=np.concatenate([b[1] for b in buffers] or [np.zeros((0, 3))]).astype(np.uint32),
+        normals=np.concatenate([b[2] for b in buffers] or [np.zeros((0, 3))]).astype(np.float32),
+        colors=np.array([b[3] for b in buffers], dtype=np.uint8).reshape(-1, 4),
+    )
+
+
+def _link_mesh_buffers(
+    scene: trimesh.Scene, geom: trimesh.Trimesh, joint_name: str, parent_node: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Transform a mesh node into its link frame in mm, returns its buffers and main color."""
+    base_transform = np.eye(4)
+    # if the dh parameters are not at 0,0,0 from the mesh we have to move the first mesh joint
+    if "J00" in joint_name:
+        base_transform_, _ = scene.graph.get(frame_to=joint_name)
+        base_transform = base_transform_.copy()
+    base_transform[:3, 3] *= 1000
+
+    # if the mesh has the pivot not in the center, we need to adjust the transform
+    cumulative_transform, _ = scene.graph.get(frame_to=parent_node)
+    ctransform = cumulative_transform.copy()
+
+    # scale positions to mm
+    ctransform[:3, 3] *= 1000
+
+    # scale mesh to mm
+    transform = base_transform @ ctransform
+    mesh_scale_matrix = np.eye(4)
+    mesh_scale_matrix[:3, :3] *= 1000
+    transform = transform @ mesh_scale_matrix
+    transformed_mesh = geom.copy()
+
+    transformed_mesh.apply_transform(transform)
+
+    if transformed_mesh.visual is not None:
+        transformed_mesh.visual = transformed_mesh.visual.to_color()
+
+    color = np.full(4, 255, dtype=np.uint8)
+    if transformed_mesh.visual and hasattr(transformed_mesh.visual, "vertex_colors"):
+        # Materials resolve to one main color, per vertex colors are reduced to their first one
+        color = np.asarray(transformed_mesh.visual.vertex_colors, dtype=np.uint8).reshape(-1, 4)[0]
+
+    return (
+        np.asarray(transformed_mesh.vertices),
+        np.asarray(transformed_mesh.faces),
+        np.asarray(transformed_mesh.vertex_normals),
+        color,
+    )
+
+
+def discover_joints(edge_data) -> JointStructure:
+    """
+    Find all child node names that contain '_J0' followed by digits or '_FLG'.
+
+    Returns:
+        Tuple of the joint names ordered by link index, the mesh nodes on the layer of each joint
+        and the link node of each mesh node.
+    """
+    joint_pattern = re.compile(r"_J0(\d+)")
+    flg_pattern = re.compile(r"_FLG")
+    matches = []
+    flg_nodes = []
+    joint_parents = {}  # Store parent for each joint/FLG
+    # Children of each node with their edge data, in scene graph order
+    children: Dict[str, List[Tuple[str, dict]]] = {}
+
+    for (parent, child), data in edge_data.items():
+        children.setdefault(parent, []).append((child, data))
+
+        # Check for joints
+        joint_match = joint_pattern.search(child)
+        if joint_match:
+            j_idx = int(joint_match.group(1))
+            matches.append((j_idx, child))
+            joint_parents[child] = parent
+
+        # Check for FLG
+        flg_match = flg_pattern.search(child)
+        if flg_match:
+            flg_nodes.append(child)
+            joint_parents[child] = parent
+
+    matches.sort(key=lambda x: x[0])
+    joint_names = [name for _, name in matches] + flg_nodes
+
+    layer_nodes, parent_nodes = {}, {}
+    for joint in joint_names:
+        layer_nodes[joint] = get_nodes_on_same_layer(
+            children, joint_parents[joint], joint, parent_nodes
+        )
+    return joint_names, layer_nodes, parent_nodes
+
+
+def get_nodes_on_same_layer(
+    children: Dict[str, List[Tuple[str, dict]]],
+    parent_node: str,
+    joint: str,
+    parent_nodes: Dict[str, str],
+) -> List[str]:
+    """
+    Find nodes on same layer and only add descendants of link nodes.
+    The link node of each found mesh node is stored in parent_nodes.
+
+    Args:
+        children: Per node its child nodes and their edge data, see discover_joints.
+        parent_node: Parent of the joint node.
+        joint: The joint node, its own subtree belongs to the next layer.
+        parent_nodes: Link node per mesh node, updated with the found mesh nodes.
+    """
+    same_layer = []
+    # First get immediate layer nodes
+    for child, data in children.get(parent_node, []):
+        if child == joint:
+            continue
+        if "geometry" in data:
+            same_layer.append(data["geometry"])
+            parent_nodes[data["geometry"]] = child
+
+        # Get all descendants for this link, every node is visited once
+        stack = [child]
+        while stack:
+            for c, descendant_data in children.get(stack.pop(), []):
+                if "geometry" in descendant_data:
+                    same_layer.append(descendant_data["geometry"])
+                    parent_nodes[descendant_data["geometry"]] = child
+                stack.append(c)
+
+    return same_layer
+
+
+def decimate_scene(
+    scene: trimesh.Scene, triangle_budget: int, cache_path: Optional[str] = None
+) -> trimesh.Scene:
+    """
+    Copy a scene with its meshes decimated to a total triangle budget.
+
+    Every mesh gets a share of the budget proportional to its triangle count. The scene graph
+    and materials are kept, so the copy can be used in place of the original scene.
+
+    Args:
+        scene: The full resolution scene.
+        triangle_budget: Number of triangles of all meshes together.
+        cache_path: Optional .npz file the decimated meshes are read from and written to. It is
+            recomputed when the scene or budget changed.
+    """
+    meshes = {
+        name: geom for name, geom in scene.geometry.items() if isinstance(geom, trimesh.Trimesh)
+    }
+    total_faces = sum(len(geom.faces) for geom in meshes.values())
+    # Identifies the source meshes and budget the cached result was computed for
+    source = np.array(
+        [triangle_budget, total_faces, sum(len(geom.vertices) for geom in meshes.values())]
+    )
+
+    cached = {}
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as data:
+                if np.array_equal(data["source"], source):
+                    cached = {key: data[key] for key in data.files}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable mesh LOD cache {cache_path}: {e}")
+
+    decimated = scene.copy()
+    arrays = {"source": source}
+    for index, (name, geom) in enumerate(meshes.items()):
+        vertices_key, faces_key = f"{index}_vertices", f"{index}_faces"
+        if vertices_key in cached:
+            vertices, faces = cached[vertices_key], cached[faces_key]
+        else:
+            face_count = max(4, triangle_budget * len(geom.faces) // max(total_faces, 1))
+            vertices, faces = decimate_mesh(geom, face_count)
+        arrays[vertices_key], arrays[faces_key] = vertices, faces
+
+        mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        if hasattr(geom.visual, "material"):
+            # Keep the material, its main color is what the visualizer renders
+            mesh.visual = trimesh.visual.TextureVisuals(material=geom.visual.material.copy())
+        mesh.metadata = dict(geom.metadata)
+        decimated.geometry[name] = mesh
+
+    if cache_path is not None and len(cached) != len(arrays):
+        try:
+            # Write atomically, visualizers of other processes may read the file concurrently
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+            np.savez(temporary_path, **arrays)
+            os.replace(temporary_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Cannot cache decimated meshes at {cache_path}: {e}")
+
+    return decimated
+
+
+def decimate_mesh(mesh: trimesh.Trimesh, face_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a mesh to at most face_count triangles.
+
+    Uses quadric decimation if fast_simplification is installed, otherwise vertex clustering.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The vertices (V, 3) and triangle indices (F, 3).
+    """
+    if len(mesh.faces) <= face_count:
+        return np.asarray(mesh.vertices), np.asarray(mesh.faces)
+
+    try:
+        simplified = mesh.simplify_quadric_decimation(face_count=face_count)
+        return np.asarray(simplified.vertices), np.asarray(simplified.faces)
+    except ImportError:
+        pass
+
+    # Search the coarsest voxel grid that still keeps the mesh within the triangle budget
+    vertices, faces = np.asarray(mesh.vertices), np.asarray(mesh.faces)
+    extent = float(np.ptp(vertices, axis=0).max()) or 1.0
+    best = cluster_vertices(vertices, faces, extent / 2)
+    low, high = extent / 1000, extent / 2
+    for _ in range(12):
+        cell_size = np.sqrt(low * high)
+        clustered = cluster_vertices(vertices, faces, cell_size)
+        if len(clustered[1]) <= face_count:
+            best, high = clustered, cell_size
+        else:
+            low = cell_size
+    return best
+
+
+def cluster_vertices(
+    vertices: np.ndarray, faces: np.ndarray, cell_size: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge all vertices within a grid cell into their mean and drop collapsed triangles."""
+    cells = np.floor((vertices - vertices.min(axis=0)) / cell_size).astype(np.int64)
+    # Pack the cell indices into one key, far fewer than 2**21 cells per axis are searched
+    keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    clustered_vertices = (
+        np.stack([np.bincount(inverse, weights=vertices[:, i]) for i in range(3)], axis=1)
+        / counts[:, None]
+    )
+
+    clustered_faces = inverse[faces]
+    valid = (
+        (clustered_faces[:, 0] != clustered_faces[:, 1])
+        & (clustered_faces[:, 1] != clustered_faces[:, 2])
+        & (clustered_faces[:, 0] != clustered_faces[:, 2])
+    )
+    clustered_faces = clustered_faces[valid]
+
+    # Triangles collapsing onto the same vertices would be rendered twice
+    _, unique_faces = np.unique(np.sort(clustered_faces, axis=1), axis=0, return_index=True)
+    clustered_faces = clustered_faces[np.sort(unique_faces)]
+
+    # Drop the vertices only referenced by collapsed triangles
+    used, remapped_faces = np.unique(clustered_faces, return_inverse=True)
+    return clustered_vertices[used], remapped_faces.reshape(-1, 3)
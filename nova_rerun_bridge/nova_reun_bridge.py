@@ -1,7 +1,7 @@
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Sequence, Tuple
 
 import numpy as np
 import rerun as rr
@@ -10,6 +10,7 @@ from nova import MotionGroup
 from nova.actions import Action, CombinedActions, WriteAction
 from nova.api import models
 from nova.core.nova import Nova
+from scipy.spatial.transform import Rotation
 from wandelbots_api_client.models import (
     FeedbackOutOfWorkspace,
     PlanTrajectoryFailedResponseErrorFeedback,
@@ -19,9 +20,18 @@ from nova_rerun_bridge import colors
 from nova_rerun_bridge.blueprint import send_blueprint
 from nova_rerun_bridge.collision_scene import log_collision_scenes
 from nova_rerun_bridge.consts import RECORDING_INTERVAL, TIME_INTERVAL_NAME
+from nova_rerun_bridge.dh_robot import DHRobot, patch_dh_parameters
 from nova_rerun_bridge.helper_scripts.download_models import get_project_root
+from nova_rerun_bridge.model_cache import set_mesh_lod
 from nova_rerun_bridge.stream_state import stream_motion_group
-from nova_rerun_bridge.trajectory import TimingMode, continue_after_sync, log_motion
+from nova_rerun_bridge.trajectory import (
+    TimingMode,
+    continue_after_sync,
+    log_action_ghosts,
+    log_motion,
+    set_carrier,
+)
+from nova_rerun_bridge.workspace import log_reachable_workspace
 
 
 class NovaRerunBridge:
@@ -46,15 +56,32 @@ class NovaRerunBridge:
     Args:
         nova (Nova): Instance of Nova client
         spawn (bool, optional): Whether to spawn Rerun viewer. Defaults to True.
+        mesh_lod (str, optional): Level of detail of the robot meshes in this recording, one of
+            "full", "medium" or "low". Defaults to "full".
+        merge_link_meshes (bool, optional): Merge the model meshes of each link into one entity,
+            so only one transform column per link is sent. Defaults to False.
+        instanced_meshes (bool, optional): Upload the model meshes once per robot model and show
+            every motion group of that model as an instance of them. Defaults to False.
     """
 
-    def __init__(self, nova: Nova, spawn: bool = True, recording_id=None) -> None:
+    def __init__(
+        self,
+        nova: Nova,
+        spawn: bool = True,
+        recording_id=None,
+        mesh_lod: str = "full",
+        merge_link_meshes: bool = False,
+        instanced_meshes: bool = False,
+    ) -> None:
         self._ensure_models_exist()
         self.nova = nova
+        self.merge_link_meshes = merge_link_meshes
+        self.instanced_meshes = instanced_meshes
         self._streaming_tasks = {}
         if spawn:
             recording_id = recording_id or f"nova_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             rr.init(application_id="nova", recording_id=recording_id, spawn=True)
+        set_mesh_lod(mesh_lod)
         logger.add(sink=rr.LoggingHandler("logs/handler"))
 
     def _ensure_models_exist(self):
@@ -154,7 +181,11 @@ class NovaRerunBridge:
         log_collision_scenes(collision_scenes=collision_scenes)
 
     async def log_motion(
-        self, motion_id: str, timing_mode=TimingMode.CONTINUE, time_offset: float = 0
+        self,
+        motion_id: str,
+        timing_mode=TimingMode.CONTINUE,
+        time_offset: float = 0,
+        keyframe_tolerance: Optional[Tuple[float, float]] = None,
     ) -> None:
         # Fetch motion details from api
         motion = await self.nova._api_client.motion_api.get_planned_motion(
@@ -191,6 +222,9 @@ class NovaRerunBridge:
             collision_scenes=collision_scenes,
             time_offset=time_offset,
             timing_mode=timing_mode,
+            merge_link_meshes=self.merge_link_meshes,
+            instanced_meshes=self.instanced_meshes,
+            keyframe_tolerance=keyframe_tolerance,
         )
 
     async def log_trajectory(
@@ -200,12 +234,40 @@ class NovaRerunBridge:
         motion_group: MotionGroup,
         timing_mode=TimingMode.CONTINUE,
         time_offset: float = 0,
+        keyframe_tolerance: Optional[Tuple[float, float]] = None,
     ) -> None:
         if len(joint_trajectory.joint_positions) == 0:
             raise ValueError("No joint trajectory provided")
         load_plan_response = await motion_group._load_planned_motion(joint_trajectory, tcp)
         await self.log_motion(
-            load_plan_response.motion, timing_mode=timing_mode, time_offset=time_offset
+            load_plan_response.motion,
+            timing_mode=timing_mode,
+            time_offset=time_offset,
+            keyframe_tolerance=keyframe_tolerance,
+        )
+
+    def set_carrier(
+        self,
+        motion_group: MotionGroup,
+        carrier: Optional[MotionGroup],
+        carrier_linear_axes: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Mount a motion group on the flange of another one, e.g. a robot on a linear track.
+
+        Trajectories of the carried motion group are then positioned by the carrier's joint
+        values at the same times. Set the carrier before logging its motion, and log the
+        carrier's motion before the motions it carries.
+
+        Args:
+            motion_group: The carried motion group.
+            carrier: The carrying motion group (external axes), None to mount on the world again.
+            carrier_linear_axes: Indices of the linear carrier joints, e.g. [0] for a linear
+                track. All carrier joints are treated as revolute (e.g. a turntable) if not given.
+        """
+        set_carrier(
+            motion_group.motion_group_id,
+            None if carrier is None else carrier.motion_group_id,
+            carrier_linear_axes,
         )
 
     def continue_after_sync(self) -> None:
@@ -245,8 +307,21 @@ class NovaRerunBridge:
         self._streaming_tasks.clear()
 
     async def log_actions(
-        self, actions: list[Action] | Action, show_connection: bool = False
+        self,
+        actions: list[Action] | Action,
+        show_connection: bool = False,
+        motion_group: Optional[MotionGroup] = None,
+        tcp: Optional[str] = None,
     ) -> None:
+        """Log the target poses of actions.
+
+        Args:
+            actions: The actions to log.
+            show_connection: Whether to connect the poses with a line.
+            motion_group: If given, a ghost robot of this motion group is logged at every pose.
+                The configurations are solved locally with analytic inverse kinematics.
+            tcp: The TCP the action poses refer to, defaults to the active TCP.
+        """
         from nova_rerun_bridge import trajectory
 
         rr.set_time_seconds(TIME_INTERVAL_NAME, trajectory._last_end_time)
@@ -286,6 +361,104 @@ class NovaRerunBridge:
                 rr.LineStrips3D([positions], colors=[155, 155, 155, 50]),
             )
 
+        if motion_group is not None and len(poses) > 0:
+            await self._log_action_ghosts(poses, motion_group, tcp)
+
+    async def _motion_group_kinematics(
+        self, motion_group: MotionGroup, tcp: Optional[str]
+    ) -> Tuple[DHRobot, models.OptimizerSetup, np.ndarray]:
+        """Get the kinematics, optimizer configuration and joint position limits of a motion group.
+
+        Joints without configured limits can rotate a full turn.
+        """
+        optimizer_config = (
+            await self.nova._api_client.motion_group_infos_api.get_optimizer_configuration(
+                self.nova.cell()._cell_id, motion_group.motion_group_id, tcp=tcp
+            )
+        )
+        motion_groups = await self.nova._api_client.motion_group_api.list_motion_groups(
+            self.nova.cell()._cell_id
+        )
+        model_from_controller = next(
+            (
+                mg.model_from_controller
+                for mg in motion_groups.instances
+                if mg.motion_group == motion_group.motion_group_id
+            ),
+            "",
+        )
+        robot = DHRobot(
+            patch_dh_parameters(model_from_controller, optimizer_config.dh_parameters),
+            optimizer_config.mounting,
+        )
+
+        joint_limits = np.array(
+            [
+                [
+                    -np.pi if limit.lower_limit is None else limit.lower_limit,
+                    np.pi if limit.upper_limit is None else limit.upper_limit,
+                ]
+                for limit in optimizer_config.safety_setup.global_limits.joint_position_limits
+            ]
+        )
+        return robot, optimizer_config, joint_limits
+
+    async def _log_action_ghosts(self, poses: list, motion_group: MotionGroup, tcp: Optional[str]):
+        robot, optimizer_config, joint_limits = await self._motion_group_kinematics(
+            motion_group, tcp
+        )
+
+        target_poses = np.tile(np.eye(4), (len(poses), 1, 1))
+        target_poses[:, :3, 3] = [[p.position.x, p.position.y, p.position.z] for p in poses]
+        target_poses[:, :3, :3] = Rotation.from_rotvec(
+            [[p.orientation.x, p.orientation.y, p.orientation.z] for p in poses]
+        ).as_matrix()
+
+        try:
+            log_action_ghosts(
+                motion_group.motion_group_id,
+                robot,
+                target_poses,
+                tcp_offset=robot.pose_to_matrix(optimizer_config.tcp),
+                joint_limits=joint_limits,
+            )
+        except ValueError as e:
+            logger.warning(f"Cannot show robot configurations for {motion_group}: {e}")
+
+    async def log_reachable_workspace(
+        self,
+        motion_group: MotionGroup,
+        tcp: Optional[str] = None,
+        num_samples: int = 1_000_000,
+        voxel_size: float = 50.0,
+        as_boxes: bool = False,
+    ) -> None:
+        """Log the workspace a motion group can reach within its joint position limits.
+
+        Joint configurations are sampled uniformly within the global joint position limits of the
+        safety setup and the reached TCP positions are binned into voxels.
+
+        Args:
+            motion_group: The motion group to compute the workspace for.
+            tcp: The TCP to compute the workspace for, defaults to the active TCP.
+            num_samples: Number of sampled joint configurations.
+            voxel_size: Edge length of a voxel in mm.
+            as_boxes: Log the occupied voxels as boxes instead of a point cloud.
+        """
+        robot, optimizer_config, joint_limits = await self._motion_group_kinematics(
+            motion_group, tcp
+        )
+
+        log_reachable_workspace(
+            motion_group.motion_group_id,
+            robot,
+            joint_limits,
+            num_samples=num_samples,
+            voxel_size=voxel_size,
+            tcp_offset=robot.pose_to_matrix(optimizer_config.tcp),
+            as_boxes=as_boxes,
+        )
+
     async def __aenter__(self) -> "NovaRerunBridge":
         """Context manager entry point.
 
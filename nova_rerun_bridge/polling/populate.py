@@ -10,6 +10,7 @@ from nova_rerun_bridge import NovaRerunBridge
 from nova_rerun_bridge.blueprint import get_blueprint
 from nova_rerun_bridge.consts import RECORDING_INTERVAL, SCHEDULE_INTERVAL, TIME_INTERVAL_NAME
 from nova_rerun_bridge.motion_storage import load_processed_motions, save_processed_motion
+from nova_rerun_bridge.trajectory import configure_fk_cache, fk_cache_stats
 
 # Global run flags
 job_running = False
@@ -77,6 +78,13 @@ async def process_motions():
 
                         await nova_bridge.log_motion(motion_id=motion_id, time_offset=time_offset)
 
+                        for motion_group, (hits, misses, rate) in fk_cache_stats().items():
+                            print(
+                                f"FK cache {motion_group}: {hits} hits, {misses} misses "
+                                f"({rate:.0%})",
+                                flush=True,
+                            )
+
                         # Save the processed motion ID and trajectory time
                         save_processed_motion(motion_id, trajectory_time)
 
@@ -100,6 +108,9 @@ async def main():
     rr.init(application_id="nova", recording_id="nova_live", spawn=False)
     rr.save("data/nova.rrd", default_blueprint=get_blueprint(motion_groups))
 
+    # Production cells repeat the same cycles, reuse their forward kinematics
+    configure_fk_cache()
+
     # Setup scheduler
     scheduler = AsyncIOScheduler()
     scheduler.add_job(
@@ -0,0 +1,88 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import trimesh
+
+from nova_rerun_bridge.consts import PRIMITIVE_CACHE_SIZE
+from nova_rerun_bridge.hull_visualizer import HullVisualizer
+
+# Generated meshes and outlines are shared by all visualizers and scenes of the process, they are
+# returned as read-only contiguous float32 positions and uint32 indices that Rerun takes without
+# conversion.
+
+
+def _read_only(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+def _positions(array) -> np.ndarray:
+    return np.ascontiguousarray(array, dtype=np.float32)
+
+
+def _indices(array) -> np.ndarray:
+    return np.ascontiguousarray(array, dtype=np.uint32)
+
+
+@lru_cache(maxsize=PRIMITIVE_CACHE_SIZE)
+def capsule_mesh(
+    radius: float, height: float, count: Optional[Tuple[int, int]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the vertices, triangle indices and vertex normals of a capsule along z.
+
+    Args:
+        radius: Radius of the capsule.
+        height: Height of the cylinder between the hemispheres.
+        count: Optional number of sections and segments of the hemispheres, see
+            trimesh.creation.capsule.
+    """
+    if count is None:
+        mesh = trimesh.creation.capsule(height=height, radius=radius)
+    else:
+        mesh = trimesh.creation.capsule(height=height, radius=radius, count=list(count))
+    return _read_only(
+        _positions(mesh.vertices), _indices(mesh.faces), _positions(mesh.vertex_normals)
+    )
+
+
+@lru_cache(maxsize=PRIMITIVE_CACHE_SIZE)
+def capsule_outlines(radius: float, height: float) -> Tuple[np.ndarray, ...]:
+    """Get the closed outline polygons of the convex hull of a coarse capsule along z."""
+    # Generate at full precision, the float32 cached mesh would merge the hull faces differently
+    mesh = trimesh.creation.capsule(height=height, radius=radius, count=[6, 8])
+    polygons = HullVisualizer.compute_hull_outlines_from_points(mesh.vertices)
+    return _read_only(*(_positions(polygon) for polygon in polygons))
+
+
+@lru_cache(maxsize=PRIMITIVE_CACHE_SIZE)
+def _hull_outlines(points: Tuple[Tuple[float, ...], ...]) -> Tuple[np.ndarray, ...]:
+    polygons = HullVisualizer.compute_hull_outlines_from_points(list(points))
+    return _read_only(*(_positions(polygon) for polygon in polygons))
+
+
+def hull_outlines(points: Sequence[Sequence[float]]) -> Tuple[np.ndarray, ...]:
+    """Get the closed outline polygons of the convex hull of points, cached by the points."""
+    return _hull_outlines(tuple(tuple(float(c) for c in p) for p in points))
+
+
+@lru_cache(maxsize=PRIMITIVE_CACHE_SIZE)
+def _hull_mesh(points: Tuple[Tuple[float, ...], ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _read_only(*HullVisualizer.compute_hull_mesh(list(_hull_outlines(points))))
+
+
+def hull_mesh(points: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the vertices, triangle indices and vertex normals of the convex hull of points, meshed
+    from its outline polygons. Cached by the points.
+    """
+    return _hull_mesh(tuple(tuple(float(c) for c in p) for p in points))
+
+
+def transform_outlines(polygons: Sequence[np.ndarray], transform: np.ndarray) -> List[np.ndarray]:
+    """Apply a 4x4 transform to outline polygons, keeping them float32."""
+    rotation = transform[:3, :3].T.astype(np.float32)
+    translation = transform[:3, 3].astype(np.float32)
+    return [polygon @ rotation + translation for polygon in polygons]
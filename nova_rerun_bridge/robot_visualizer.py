@@ -1,22 +1,154 @@
-import re
-from typing import List
+import bisect
+import hashlib
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import rerun as rr
-import trimesh
 from nova.api import models
 from scipy.spatial.transform import Rotation
 
 from nova_rerun_bridge import colors
+from nova_rerun_bridge.consts import TIME_INTERVAL_NAME
 from nova_rerun_bridge.conversion_helpers import normalize_pose
 from nova_rerun_bridge.dh_robot import DHRobot
-from nova_rerun_bridge.helper_scripts.download_models import get_project_root
-from nova_rerun_bridge.hull_visualizer import HullVisualizer
-
+from nova_rerun_bridge.model_cache import (  # noqa: F401
+    get_mesh_lod,
+    get_model_path,
+    load_robot_model,
+)
+from nova_rerun_bridge.primitives import (
+    capsule_mesh,
+    capsule_outlines,
+    hull_mesh,
+    hull_outlines,
+    transform_outlines,
+)
+from nova_rerun_bridge.sample_history import merge_sample_history
+
+# Geometry logged per (recording, entity path) as (time, content hash) entries sorted by time,
+# each entry is the geometry Rerun resolves latest-at from its time until the next entry
+_logged_geometries: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+
+# Robots sharing instanced meshes per (recording, model, LOD profile, merged link meshes). Per
+# robot base entity path its logged sample times and link frames, pruned to the last sample
+# before its latest motion and everything after it, and per mesh entity (relative to the base
+# path) its link index and offset.
+_instanced_robots: Dict[
+    Tuple[str, str, str, bool],
+    Dict[str, Tuple[np.ndarray, np.ndarray, Dict[str, Tuple[int, np.ndarray]]]],
+] = {}
+
+
+def geometry_hash(*parts) -> str:
+    """Hash geometry buffers and parameters to detect identical uploads."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(str(part.dtype).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def is_geometry_logged(entity_path: str, content_hash: str, time: float) -> bool:
+    """
+    Check whether the current recording already shows identical geometry at the entity from the
+    given time on. Otherwise the geometry is registered as logged at that time, the caller has to
+    log it.
+
+    Args:
+        entity_path: The entity the geometry is logged at.
+        content_hash: Hash of the geometry, see geometry_hash.
+        time: Time the geometry is logged at, -inf for static data.
+    """
+    key = (rr.get_recording_id(), entity_path)
+    entries = _logged_geometries.setdefault(key, [])
+    index = bisect.bisect_right([entry_time for entry_time, _ in entries], time)
+
+    # Skip only if the geometry shown at the time is identical and nothing is logged after it
+    if index == len(entries) and index > 0 and entries[-1][1] == content_hash:
+        return True
+
+    # Rows logged at the same time are resolved by their order, the new one wins
+    if index > 0 and entries[index - 1][0] == time:
+        index -= 1
+        del entries[index]
+    entries.insert(index, (time, content_hash))
+
+    # Entries repeating the geometry of their predecessor change nothing that is shown
+    _logged_geometries[key] = [
+        entry for i, entry in enumerate(entries) if i == 0 or entry[1] != entries[i - 1][1]
+    ]
+    return False
+
+
+def rotation_angles(quaternions: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Angles in radians between unit quaternions, broadcast over leading dimensions."""
+    cos_half_angles = np.abs(np.sum(quaternions * reference, axis=-1))
+    return 2 * np.arccos(np.minimum(cos_half_angles, 1.0))
+
+
+def select_keyframes(
+    translations: np.ndarray,
+    quaternions: np.ndarray,
+    translation_tolerance: float,
+    rotation_tolerance: float,
+) -> np.ndarray:
+    """
+    Select the samples of a pose column that have to be logged to show it within a tolerance.
+
+    Rerun holds the latest logged transform until the next one, so a sample is dropped when the
+    previous keyframe deviates from it by at most the translation and rotation tolerance. The
+    first and last samples are always kept.
+
+    Args:
+        translations: Translations of shape (N, 3).
+        quaternions: Unit quaternions of shape (N, 4).
+        translation_tolerance: Maximum position error in mm.
+        rotation_tolerance: Maximum rotation error in radians, a point at distance r from the
+            frame origin is shown at most r * rotation_tolerance off.
+
+    Returns:
+        np.ndarray: Increasing indices of the keyframes.
+    """
+    num_samples = len(translations)
+
+    # A sample more than twice the tolerance away from its predecessor is more than the tolerance
+    # away from any keyframe held at its predecessor, so fast segments need no search
+    forced = (
+        np.flatnonzero(
+            (np.linalg.norm(np.diff(translations, axis=0), axis=1) > 2 * translation_tolerance)
+            | (rotation_angles(quaternions[1:], quaternions[:-1]) > 2 * rotation_tolerance)
+        )
+        + 1
+    )
+    bounds = np.concatenate([[0], forced, [num_samples]])
+
+    keyframes = []
+    for key, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        keyframes.append(key)
+        start, window = key + 1, 16
+        while start < stop:
+            end = min(start + window, stop)
+            exceeded = np.flatnonzero(
+                (
+                    np.linalg.norm(translations[start:end] - translations[key], axis=1)
+                    > translation_tolerance
+                )
+                | (rotation_angles(quaternions[start:end], quaternions[key]) > rotation_tolerance)
+            )
+            if len(exceeded):
+                key = start + int(exceeded[0])
+                keyframes.append(key)
+                # Expect the next keyframe at a similar distance
+                start, window = key + 1, max(16, 2 * int(exceeded[0]) + 2)
+            else:
+                start, window = end, 2 * window
 
-def get_model_path(model_name: str) -> str:
-    """Get absolute path to model file in project directory"""
-    return str(get_project_root() / "models" / f"{model_name}.glb")
+    if keyframes[-1] != num_samples - 1:
+        keyframes.append(num_samples - 1)
+    return np.array(keyframes)
 
 
 class RobotVisualizer:
@@ -31,6 +163,9 @@ class RobotVisualizer:
         collision_link_chain=None,
         collision_tcp=None,
         model_from_controller="",
+        mesh_lod: Optional[str] = None,
+        merge_link_meshes: bool = False,
+        instanced: bool = False,
     ):
         """
         :param robot: DHRobot instance
@@ -40,6 +175,12 @@ class RobotVisualizer:
         :param base_entity_path: A base path prefix for logging the entities (e.g. motion group name)
         :param albedo_factor: A list representing the RGB values [R, G, B] to apply as the albedo factor.
         :param glb_path: Path to the GLB file for the robot model.
+        :param mesh_lod: Mesh level of detail, defaults to the profile of the current recording.
+        :param merge_link_meshes: If True, all mesh nodes of a link are merged into one entity with
+            vertex colors, so only one transform column per link is sent.
+        :param instanced: If True, the model meshes are logged once per model below
+            motion/instances and every robot of that model is an instance of them. Applies to
+            trajectories logged with log_robot_geometries.
         """
         self.robot = robot
         self.link_geometries = {}
@@ -51,24 +192,43 @@ class RobotVisualizer:
         self.mesh_loaded = False
         self.collision_link_geometries = {}
         self.collision_tcp_geometries = collision_tcp
+        self.merge_link_meshes = merge_link_meshes
+        self.instanced = instanced
+        self.model_name = model_from_controller
+        self.mesh_lod = mesh_lod or get_mesh_lod()
 
         # This will hold the names of discovered joints (e.g. ["robot_J00", "robot_J01", ...])
         self.joint_names: List[str] = []
         self.layer_nodes_dict = {}
         self.parent_nodes_dict = {}
 
+        # Per link index the joint name and (entity path, mesh nodes, link to mesh transform)
+        self.mesh_offsets: Dict[int, Tuple[str, List[Tuple[str, List[str], np.ndarray]]]] = {}
+
+        # Collision geometries as (entity path, collider, geometry pose, link index or -1 for the
+        # TCP) and their link to collider transforms of shape (M, 4, 4), in the same order
+        self.colliders: List[Tuple[str, models.Collider, models.PlannerPose, int]] = []
+        self.collider_offsets = np.zeros((0, 4, 4))
+
+        # Time the geometries are currently logged at, None if unknown (e.g. while streaming)
+        self.log_time: Optional[float] = None
+
+        # Last logged joint configuration and its link frames, used to only re-log moved links
+        self.last_joint_values = None
+        self.last_link_transforms = None
+
         # load mesh
         try:
-            glb_path = get_model_path(model_from_controller)
-            self.scene = trimesh.load(glb_path, file_type="glb")
+            # Shared read-only model, preprocessed once per model file and memory mapped
+            self.model = load_robot_model(model_from_controller, self.mesh_lod)
             self.mesh_loaded = True
-            self.edge_data = self.scene.graph.transforms.edge_data
-
-            # After loading, auto-discover any child nodes that match *_J0n
-            self.discover_joints()
+            self.joint_names = self.model.joint_names
+            self.layer_nodes_dict = self.model.layer_nodes
+            self.parent_nodes_dict = self.model.parent_nodes
+            self.compile_mesh_offsets()
         except Exception as e:
             print(f"Failed to load mesh: {e}")
-            self.scene = None
+            self.model = None
 
         # Group geometries by link
         for gm in robot_model_geometries:
@@ -76,71 +236,85 @@ class RobotVisualizer:
 
         # Group geometries by link
         self.collision_link_geometries = collision_link_chain
+        self.compile_collider_offsets()
 
-    def discover_joints(self):
+    def compile_collider_offsets(self):
         """
-        Find all child node names that contain '_J0' followed by digits or '_FLG'.
-        Store joints with their parent nodes and print layer information.
+        Convert the poses of the collision link chain and TCP colliders once into a table of
+        link to collider transforms, instead of converting them for every logged trajectory.
         """
-        joint_pattern = re.compile(r"_J0(\d+)")
-        flg_pattern = re.compile(r"_FLG")
-        matches = []
-        flg_nodes = []
-        joint_parents = {}  # Store parent for each joint/FLG
-
-        for (parent, child), data in self.edge_data.items():
-            # Check for joints
-            joint_match = joint_pattern.search(child)
-            if joint_match:
-                j_idx = int(joint_match.group(1))
-                matches.append((j_idx, child))
-                joint_parents[child] = parent
-
-            # Check for FLG
-            flg_match = flg_pattern.search(child)
-            if flg_match:
-                flg_nodes.append(child)
-                joint_parents[child] = parent
-
-        matches.sort(key=lambda x: x[0])
-        self.joint_names = [name for _, name in matches] + flg_nodes
-
-        # print("Discovered nodes:", self.joint_names)
-        # Print layer information for each joint
-        for joint in self.joint_names:
-            self.get_nodes_on_same_layer(joint_parents[joint], joint)
-            # print(f"\nNodes on same layer as {joint}:")
-            # print(f"Parent node: {joint_parents[joint]}")
-            # print(f"Layer nodes: {same_layer_nodes}")
-
-    def get_nodes_on_same_layer(self, parent_node, joint):
+        self.colliders = []
+        offsets = []
+        for link_index, geometries in enumerate(self.collision_link_geometries or []):
+            for geom_id, collider in geometries.items():
+                pose = normalize_pose(collider.pose)
+                self.colliders.append(
+                    (
+                        f"{self.base_entity_path}/collision/links/link_{link_index}/geometry_{geom_id}",
+                        collider,
+                        pose,
+                        link_index,
+                    )
+                )
+                offsets.append(self.geometry_pose_to_matrix(pose))
+
+        # tcp collision geometries are defined in flange frame
+        identity_pose = models.PlannerPose(
+            position=models.Vector3d(x=0, y=0, z=0),
+            orientation=models.Quaternion(x=0, y=0, z=0, w=1),
+        )
+        for geom_id, collider in (self.collision_tcp_geometries or {}).items():
+            self.colliders.append(
+                (
+                    f"{self.base_entity_path}/collision/tcp/geometry_{geom_id}",
+                    collider,
+                    identity_pose,
+                    -1,
+                )
+            )
+            offsets.append(self.geometry_pose_to_matrix(normalize_pose(collider.pose)))
+
+        self.collider_offsets = np.array(offsets).reshape(-1, 4, 4)
+
+    def compile_mesh_offsets(self):
         """
-        Find nodes on same layer and only add descendants of link nodes.
+        Precompute the constant transform from each link frame to each of its mesh nodes.
+        It is logged once as the offset of the mesh entity below its link frame entity.
         """
-        same_layer = []
-        # First get immediate layer nodes
-        for (parent, child), data in self.edge_data.items():
-            if parent == parent_node:
-                if child == joint:
-                    continue
-                if "geometry" in data:
-                    same_layer.append(data["geometry"])
-                    self.parent_nodes_dict[data["geometry"]] = child
-
-                # Get all descendants for this link
-                parentChild = child
-                stack = [child]
-                while stack:
-                    current = stack.pop()
-                    for (p, c), data in self.edge_data.items():
-                        if p == current:
-                            if "geometry" in data:
-                                same_layer.append(data["geometry"])
-                                self.parent_nodes_dict[data["geometry"]] = parentChild
-                            stack.append(c)
-
-        self.layer_nodes_dict[joint] = same_layer
-        return same_layer
+        root_transform = self.get_transform_matrix()
+
+        self.mesh_offsets = {}
+        for link_index, joint_name in enumerate(self.joint_names):
+            same_layer_nodes = self.layer_nodes_dict.get(joint_name)
+            if not same_layer_nodes:
+                continue
+
+            # inverse transform to get the mesh in the correct position, positions in mm
+            inverse_transform = self.model.joint_transform(joint_name)
+
+            # DH theta is rotated, rotate mesh around z in direction of theta
+            rotation_matrix_z_4x4 = np.eye(4)
+            if len(self.robot.dh_parameters) > link_index:
+                rotation_matrix_z_4x4[:3, :3] = Rotation.from_euler(
+                    "z", self.robot.theta_offset[link_index], degrees=False
+                ).as_matrix()
+
+            offset = rotation_matrix_z_4x4 @ root_transform @ inverse_transform
+
+            meshes = []
+            for node_name in same_layer_nodes:
+                if self.model.has_mesh(joint_name, node_name):
+                    entity_path = (
+                        f"{self.base_entity_path}/visual/links/link_{link_index}/mesh/{node_name}"
+                    )
+                    meshes.append((entity_path, [node_name], offset))
+
+            if self.merge_link_meshes and meshes:
+                # All nodes of a link share its rigid transform
+                entity_path = f"{self.base_entity_path}/visual/links/link_{link_index}/mesh"
+                meshes = [(entity_path, [nodes[0] for _, nodes, _ in meshes], offset)]
+
+            self.mesh_offsets[link_index] = (joint_name, meshes)
 
     def geometry_pose_to_matrix(self, init_pose: models.PlannerPose):
         # Convert init_pose to PlannerPose and then to a matrix via the robot
@@ -157,23 +331,6 @@ class RobotVisualizer:
         )
         return self.robot.pose_to_matrix(p)
 
-    def compute_forward_kinematics(self, joint_values):
-        """Compute link transforms using the robot's methods."""
-        accumulated = self.robot.pose_to_matrix(self.robot.mounting)
-        transforms = [accumulated.copy()]
-        for dh_param, joint_rot in zip(self.robot.dh_parameters, joint_values.joints):
-            transform = self.robot.dh_transform(dh_param, joint_rot)
-            accumulated = accumulated @ transform
-            transforms.append(accumulated.copy())
-        return transforms
-
-    def rotation_matrix_to_axis_angle(self, Rm):
-        """Use scipy for cleaner axis-angle extraction."""
-        rot = Rotation.from_matrix(Rm)
-        angle = rot.magnitude()
-        axis = rot.as_rotvec() / angle if angle > 1e-8 else np.array([1.0, 0.0, 0.0])
-        return axis, angle
-
     def gamma_lift_single_color(self, color: np.ndarray, gamma: float = 0.8) -> np.ndarray:
         """
         Apply gamma correction to a single RGBA color in-place.
@@ -204,63 +361,116 @@ class RobotVisualizer:
             ]
         )
 
-    def init_mesh(self, entity_path: str, geom, joint_name):
-        """Generic method to log a single geometry, either capsule or box."""
-
-        if entity_path not in self.logged_meshes:
-            if geom.metadata.get("node") not in self.parent_nodes_dict:
-                return
-
-            base_transform = np.eye(4)
-            # if the dh parameters are not at 0,0,0 from the mesh we have to move the first mesh joint
-            if "J00" in joint_name:
-                base_transform_, _ = self.scene.graph.get(frame_to=joint_name)
-                base_transform = base_transform_.copy()
-            base_transform[:3, 3] *= 1000
+    def is_geometry_logged(self, entity_path: str, content_hash: str, static: bool = False) -> bool:
+        """
+        Check whether the recording already shows identical geometry at the entity from the
+        current log time on. Otherwise the geometry is registered as logged now, the caller has
+        to log it.
+        """
+        time = -np.inf if static else self.log_time
+        if time is None:
+            # Without a known log time nothing can be skipped or registered safely
+            return False
+        return is_geometry_logged(entity_path, content_hash, time)
 
-            # if the mesh has the pivot not in the center, we need to adjust the transform
-            cumulative_transform, _ = self.scene.graph.get(
-                frame_to=self.parent_nodes_dict[geom.metadata.get("node")]
-            )
-            ctransform = cumulative_transform.copy()
+    def mesh_buffers(self, node_name: str, joint_name: str):
+        """
+        Get the buffers of a model mesh node in its link frame in mm.
 
-            # scale positions to mm
-            ctransform[:3, 3] *= 1000
+        Returns:
+            Tuple of vertices, triangle indices, vertex normals and albedo color of the mesh or
+            None if the node does not belong to a link.
+        """
+        buffers = self.model.mesh_buffers(joint_name, node_name)
+        if buffers is None:
+            return None
+
+        vertices, faces, vertex_normals, color = buffers
+        # The model arrays are shared and may be read-only, lift a copy of the color
+        return (
+            vertices,
+            faces,
+            vertex_normals,
+            self.gamma_lift_single_color(color.copy(), gamma=0.5),
+        )
 
-            # scale mesh to mm
-            transform = base_transform @ ctransform
-            mesh_scale_matrix = np.eye(4)
-            mesh_scale_matrix[:3, :3] *= 1000
-            transform = transform @ mesh_scale_matrix
-            transformed_mesh = geom.copy()
+    def log_offset(self, entity_path: str, offset: np.ndarray, static: bool = False):
+        """Log the constant transform of a geometry entity relative to its link frame entity."""
+        rr.log(
+            entity_path,
+            rr.Transform3D(translation=offset[:3, 3], mat3x3=offset[:3, :3]),
+            static=static,
+        )
 
-            transformed_mesh.apply_transform(transform)
+    def init_mesh(
+        self, entity_path: str, node_names: List[str], joint_name: str, offset: np.ndarray
+    ):
+        """
+        Log the model mesh nodes of an entity, merged into one mesh with vertex colors, and its
+        offset from the link frame.
+        """
 
-            if transformed_mesh.visual is not None:
-                transformed_mesh.visual = transformed_mesh.visual.to_color()
+        if entity_path in self.logged_meshes:
+            return
 
-            vertex_colors = None
-            if transformed_mesh.visual and hasattr(transformed_mesh.visual, "vertex_colors"):
-                vertex_colors = transformed_mesh.visual.vertex_colors
+        buffers = [self.mesh_buffers(node_name, joint_name) for node_name in node_names]
+        buffers = [b for b in buffers if b is not None]
+        if not buffers:
+            return
 
-            rr.log(
-                entity_path,
-                rr.Mesh3D(
-                    vertex_positions=transformed_mesh.vertices,
-                    triangle_indices=transformed_mesh.faces,
-                    vertex_normals=getattr(transformed_mesh, "vertex_normals", None),
-                    albedo_factor=self.gamma_lift_single_color(vertex_colors, gamma=0.5),
-                ),
+        if not self.merge_link_meshes:
+            vertices, faces, vertex_normals, albedo_factor = buffers[0]
+            mesh = rr.Mesh3D(
+                vertex_positions=vertices,
+                triangle_indices=faces,
+                vertex_normals=vertex_normals,
+                albedo_factor=albedo_factor,
             )
+            content_hash = geometry_hash(vertices, faces, vertex_normals, albedo_factor, offset)
+        else:
+            # Keep the merged buffers float32 / uint32 like the model arrays
+            vertex_offsets = np.cumsum([0] + [len(b[0]) for b in buffers[:-1]], dtype=np.uint32)
+            vertices = np.concatenate([b[0] for b in buffers])
+            faces = np.concatenate([b[1] + offset for b, offset in zip(buffers, vertex_offsets)])
+            vertex_normals = np.concatenate([b[2] for b in buffers])
+            # Materials have one main color, spread it over the vertices of their node
+            vertex_colors = np.concatenate([np.broadcast_to(b[3], (len(b[0]), 4)) for b in buffers])
+            mesh = rr.Mesh3D(
+                vertex_positions=vertices,
+                triangle_indices=faces,
+                vertex_normals=vertex_normals,
+                vertex_colors=vertex_colors,
+            )
+            content_hash = geometry_hash(vertices, faces, vertex_normals, vertex_colors, offset)
 
-            self.logged_meshes.add(entity_path)
+        if not self.is_geometry_logged(entity_path, content_hash):
+            rr.log(entity_path, mesh)
+            self.log_offset(entity_path, offset)
+
+        self.logged_meshes.add(entity_path)
 
     def init_collision_geometry(
-        self, entity_path: str, collider: models.Collider, pose: models.PlannerPose
+        self,
+        entity_path: str,
+        collider: models.Collider,
+        pose: models.PlannerPose,
+        offset: np.ndarray,
     ):
         if entity_path in self.logged_meshes:
             return
 
+        content_hash = geometry_hash(
+            collider.shape.actual_instance,
+            collider.pose,
+            [pose.position.x, pose.position.y, pose.position.z],
+            offset,
+        )
+        if self.is_geometry_logged(entity_path, content_hash, static=True):
+            self.logged_meshes.add(entity_path)
+            return
+
+        self.log_offset(entity_path, offset, static=True)
+
         if collider.shape.actual_instance.shape_type == "sphere":
             rr.log(
                 f"{entity_path}",
@@ -295,13 +505,7 @@ class RobotVisualizer:
             height = collider.shape.actual_instance.cylinder_height
             radius = collider.shape.actual_instance.radius
 
-            # Generate trimesh capsule
-            capsule = trimesh.creation.capsule(height=height, radius=radius, count=[6, 8])
-
-            # Extract vertices and faces for solid visualization
-            vertices = np.array(capsule.vertices)
-
-            # Transform vertices to world position
+            # Transform the cached capsule outlines to the collider position
             transform = np.eye(4)
             transform[:3, 3] = [pose.position.x, pose.position.y, pose.position.z - height / 2]
             rot_mat = Rotation.from_quat(
@@ -314,40 +518,32 @@ class RobotVisualizer:
             )
             transform[:3, :3] = rot_mat.as_matrix()
 
-            vertices = np.array([transform @ np.append(v, 1) for v in vertices])[:, :3]
-
-            polygons = HullVisualizer.compute_hull_outlines_from_points(vertices)
+            polygons = transform_outlines(capsule_outlines(radius, height), transform)
 
             if polygons:
-                line_segments = [p.tolist() for p in polygons]
                 rr.log(
                     f"{entity_path}",
                     rr.LineStrips3D(
-                        line_segments,
-                        radii=rr.Radius.ui_points(0.75),
-                        colors=[[221, 193, 193, 255]],
+                        polygons, radii=rr.Radius.ui_points(0.75), colors=[[221, 193, 193, 255]]
                     ),
                     static=True,
                     timeless=True,
                 )
 
         elif collider.shape.actual_instance.shape_type == "convex_hull":
-            polygons = HullVisualizer.compute_hull_outlines_from_points(
-                collider.shape.actual_instance.vertices
-            )
+            polygons = hull_outlines(collider.shape.actual_instance.vertices)
 
             if polygons:
-                line_segments = [p.tolist() for p in polygons]
                 rr.log(
                     f"{entity_path}",
                     rr.LineStrips3D(
-                        line_segments, radii=rr.Radius.ui_points(1.5), colors=[colors.colors[2]]
+                        polygons, radii=rr.Radius.ui_points(1.5), colors=[colors.colors[2]]
                     ),
                     static=True,
                     timeless=True,
                 )
 
-                vertices, triangles, normals = HullVisualizer.compute_hull_mesh(polygons)
+                vertices, triangles, normals = hull_mesh(collider.shape.actual_instance.vertices)
 
                 rr.log(
                     f"{entity_path}",
@@ -363,12 +559,27 @@ class RobotVisualizer:
 
         self.logged_meshes.add(entity_path)
 
-    def init_geometry(self, entity_path: str, capsule):
-        """Generic method to log a single geometry, either capsule or box."""
+    def init_geometry(self, entity_path: str, capsule, offset: np.ndarray):
+        """
+        Generic method to log a single geometry, either capsule or box, and its offset from the
+        link frame.
+        """
 
         if entity_path in self.logged_meshes:
             return
 
+        content_hash = geometry_hash(
+            capsule and (capsule.radius, capsule.cylinder_height),
+            self.static_transform,
+            self.albedo_factor,
+            offset,
+        )
+        if self.is_geometry_logged(entity_path, content_hash):
+            self.logged_meshes.add(entity_path)
+            return
+
+        self.log_offset(entity_path, offset)
+
         if capsule:
             radius = capsule.radius
             height = capsule.cylinder_height
@@ -378,15 +589,14 @@ class RobotVisualizer:
                 radius *= 0.99
                 height *= 0.99
 
-            # Create capsule and retrieve normals
-            cap_mesh = trimesh.creation.capsule(radius=radius, height=height)
-            vertex_normals = cap_mesh.vertex_normals.tolist()
+            # Shared capsule mesh with normals, generated once per size
+            vertices, faces, vertex_normals = capsule_mesh(radius, height)
 
             rr.log(
                 entity_path,
                 rr.Mesh3D(
-                    vertex_positions=cap_mesh.vertices.tolist(),
-                    triangle_indices=cap_mesh.faces.tolist(),
+                    vertex_positions=vertices,
+                    triangle_indices=faces,
                     vertex_normals=vertex_normals,
                     albedo_factor=self.albedo_factor,
                 ),
@@ -397,221 +607,251 @@ class RobotVisualizer:
             rr.log(entity_path, rr.Boxes3D(half_sizes=[[50, 50, 50]]))
             self.logged_meshes.add(entity_path)
 
-    def log_robot_geometry(self, joint_position):
-        transforms = self.compute_forward_kinematics(joint_position)
+    def log_robot_geometry(self, joint_position) -> bool:
+        """
+        Log the robot geometries for a single joint configuration.
+        Only the frames of links that moved since the previous call are logged again.
 
-        def log_geometry(entity_path, transform):
-            translation = transform[:3, 3]
-            Rm = transform[:3, :3]
-            axis, angle = self.rotation_matrix_to_axis_angle(Rm)
+        Returns:
+            bool: True if any link moved and its geometries were logged.
+        """
+        transforms, first_changed_link = self.robot.update_link_transforms(
+            joint_position.joints, self.last_joint_values, self.last_link_transforms
+        )
+        self.last_joint_values = np.asarray(joint_position.joints, dtype=np.float64)
+        self.last_link_transforms = transforms
+
+        if first_changed_link >= len(transforms):
+            return False
+
+        # Log robot joint geometries
+        if self.mesh_loaded:
+            for link_index, (joint_name, meshes) in self.mesh_offsets.items():
+                if link_index < len(transforms):
+                    for entity_path, node_names, offset in meshes:
+                        self.init_mesh(entity_path, node_names, joint_name, offset)
+
+        # Log link geometries
+        for link_index, geometries in self.link_geometries.items():
+            for i, geom in enumerate(geometries):
+                entity_path = f"{self.base_entity_path}/safety_from_controller/links/link_{link_index}/geometry_{i}"
+                self.init_geometry(
+                    entity_path, geom.capsule, self.geometry_pose_to_matrix(geom.init_pose)
+                )
+
+        # Log TCP geometries
+        if self.tcp_geometries:
+            for i, geom in enumerate(self.tcp_geometries):
+                entity_path = f"{self.base_entity_path}/safety_from_controller/tcp/geometry_{i}"
+                self.init_geometry(
+                    entity_path, geom.capsule, self.geometry_pose_to_matrix(geom.init_pose)
+                )
+
+        # Only the frames of moved links are logged, the final frame moves whenever any link moved
+        for entity_path, link_index in self.link_frames(len(transforms), collision=False).items():
+            if link_index != -1 and link_index < first_changed_link:
+                continue
+            transform = transforms[link_index]
             rr.log(
                 entity_path,
-                rr.InstancePoses3D(
-                    translations=[translation.tolist()],
-                    rotation_axis_angles=[
-                        rr.RotationAxisAngle(axis=axis.tolist(), angle=float(angle))
-                    ],
+                rr.Transform3D(
+                    translation=transform[:3, 3],
+                    quaternion=rr.Quaternion(
+                        xyzw=Rotation.from_matrix(transform[:3, :3]).as_quat()
+                    ),
                 ),
                 static=self.static_transform,
-                timeless=self.static_transform,
             )
 
-        # Log robot joint geometries
-        if self.mesh_loaded:
-            for link_index, joint_name in enumerate(self.joint_names):
-                link_transform = transforms[link_index]
+        return True
 
-                # Get nodes on same layer using dictionary
-                same_layer_nodes = self.layer_nodes_dict.get(joint_name)
-                if not same_layer_nodes:
-                    continue
+    def link_frames(self, num_frames: int, collision: bool = True) -> Dict[str, int]:
+        """
+        Get the link frame entities that have geometries attached.
 
-                filtered_geoms = []
-                for node_name in same_layer_nodes:
-                    if node_name in self.scene.geometry:
-                        geom = self.scene.geometry[node_name]
-                        # Add metadata that would normally come from dump
-                        geom.metadata = {"node": node_name}
-                        filtered_geoms.append(geom)
+        Geometries are logged as children of their link frame entity with a constant offset, so
+        per joint configuration only one transform per link frame is logged.
 
-                for geom in filtered_geoms:
-                    entity_path = f"{self.base_entity_path}/visual/links/link_{link_index}/mesh/{geom.metadata.get('node')}"
+        Args:
+            num_frames: Number of link frames computed by the forward kinematics.
+            collision: Include the frames of the collision geometries.
 
-                    # calculate the inverse transform to get the mesh in the correct position
-                    cumulative_transform, _ = self.scene.graph.get(frame_to=joint_name)
-                    ctransform = cumulative_transform.copy()
-                    inverse_transform = np.linalg.inv(ctransform)
+        Returns:
+            Dict[str, int]: Per link frame entity path the index of its frame, -1 for the TCP.
+        """
+        frames = {}
+        if self.mesh_loaded and not self.instanced:
+            for link_index, (_, meshes) in self.mesh_offsets.items():
+                if meshes and link_index < num_frames:
+                    frames[f"{self.base_entity_path}/visual/links/link_{link_index}"] = link_index
+        for link_index, geometries in self.link_geometries.items():
+            if geometries:
+                frames[
+                    f"{self.base_entity_path}/safety_from_controller/links/link_{link_index}"
+                ] = link_index
+        if self.tcp_geometries:
+            frames[f"{self.base_entity_path}/safety_from_controller/tcp"] = -1
+        if collision:
+            for entity_path, _, _, link_index in self.colliders:
+                frames[entity_path.rsplit("/", 1)[0]] = link_index
+        return frames
 
-                    # DH theta is rotated, rotate mesh around z in direction of theta
-                    rotation_matrix_z_4x4 = np.eye(4)
-                    if len(self.robot.dh_parameters) > link_index:
-                        rotation_z_minus_90 = Rotation.from_euler(
-                            "z", self.robot.dh_parameters[link_index].theta, degrees=False
-                        ).as_matrix()
-                        rotation_matrix_z_4x4[:3, :3] = rotation_z_minus_90
+    def log_robot_geometries(
+        self,
+        trajectory: List[models.TrajectorySample],
+        times_column,
+        link_transforms: Optional[np.ndarray] = None,
+        keyframe_tolerance: Optional[Tuple[float, float]] = None,
+    ):
+        """
+        Log the robot geometries for each link and TCP as separate entities.
 
-                    # scale positions to mm
-                    inverse_transform[:3, 3] *= 1000
+        Geometries are children of their link frame entity with a constant offset, only the link
+        frames are logged per trajectory sample.
 
-                    root_transform = self.get_transform_matrix()
+        Args:
+            trajectory (List[wb.models.TrajectorySample]): The list of trajectory sample points.
+            times_column (rr.TimeSecondsColumn): The time column associated with the trajectory points.
+            link_transforms (np.ndarray, optional): Precomputed FK of shape (N, J+1, 4, 4) for the
+                trajectory. Computed from the trajectory joint positions if not given.
+            keyframe_tolerance (Tuple[float, float], optional): Translation (mm) and rotation
+                (rad) tolerance of the link frames. Only the keyframes of each link frame are
+                logged, see select_keyframes. Every sample is logged if not given. Instanced
+                meshes are always logged at every sample.
+        """
+        if link_transforms is None:
+            joint_values = np.array(
+                [point.joint_position.joints for point in trajectory], dtype=np.float64
+            ).reshape(len(trajectory), -1)
+            link_transforms = self.robot.calculate_link_transforms_batch(joint_values)
 
-                    transform = root_transform @ inverse_transform
+        if len(link_transforms) == 0:
+            return
 
-                    final_transform = link_transform @ rotation_matrix_z_4x4 @ transform
+        # Geometries are first logged at the start of the trajectory at the latest. A reused
+        # visualizer may log this trajectory before earlier ones, so whether an entity has to be
+        # sent again is decided by is_geometry_logged and not by what this visualizer logged.
+        self.log_time = float(times_column.times[0])
+        self.logged_meshes.clear()
 
-                    self.init_mesh(entity_path, geom, joint_name)
-                    log_geometry(entity_path, final_transform)
+        # Log robot joint geometries
+        if self.mesh_loaded and self.instanced:
+            self.log_instanced_meshes(np.asarray(times_column.times), link_transforms)
+        elif self.mesh_loaded:
+            for link_index, (joint_name, meshes) in self.mesh_offsets.items():
+                if link_index >= link_transforms.shape[1]:
+                    break
+                for entity_path, node_names, offset in meshes:
+                    self.init_mesh(entity_path, node_names, joint_name, offset)
 
         # Log link geometries
         for link_index, geometries in self.link_geometries.items():
-            link_transform = transforms[link_index]
             for i, geom in enumerate(geometries):
                 entity_path = f"{self.base_entity_path}/safety_from_controller/links/link_{link_index}/geometry_{i}"
-                final_transform = link_transform @ self.geometry_pose_to_matrix(geom.init_pose)
-
-                self.init_geometry(entity_path, geom.capsule)
-                log_geometry(entity_path, final_transform)
+                self.init_geometry(
+                    entity_path, geom.capsule, self.geometry_pose_to_matrix(geom.init_pose)
+                )
 
         # Log TCP geometries
         if self.tcp_geometries:
-            tcp_transform = transforms[-1]  # the final frame transform
             for i, geom in enumerate(self.tcp_geometries):
                 entity_path = f"{self.base_entity_path}/safety_from_controller/tcp/geometry_{i}"
-                final_transform = tcp_transform @ self.geometry_pose_to_matrix(geom.init_pose)
-
-                self.init_geometry(entity_path, geom.capsule)
-                log_geometry(entity_path, final_transform)
-
-    def log_robot_geometries(self, trajectory: List[models.TrajectorySample], times_column):
-        """
-        Log the robot geometries for each link and TCP as separate entities.
-
-        Args:
-            trajectory (List[wb.models.TrajectorySample]): The list of trajectory sample points.
-            times_column (rr.TimeSecondsColumn): The time column associated with the trajectory points.
-        """
-        link_positions = {}
-        link_rotations = {}
-
-        def collect_geometry_data(entity_path, transform):
-            """Helper to collect geometry data for a given entity."""
-            translation = transform[:3, 3].tolist()
-            Rm = transform[:3, :3]
-            axis, angle = self.rotation_matrix_to_axis_angle(Rm)
-            if entity_path not in link_positions:
-                link_positions[entity_path] = []
-                link_rotations[entity_path] = []
-            link_positions[entity_path].append(translation)
-            link_rotations[entity_path].append(rr.RotationAxisAngle(axis=axis, angle=angle))
-
-        for point in trajectory:
-            transforms = self.compute_forward_kinematics(point.joint_position)
-
-            # Log robot joint geometries
-            if self.mesh_loaded:
-                for link_index, joint_name in enumerate(self.joint_names):
-                    if link_index >= len(transforms):
-                        break
-                    link_transform = transforms[link_index]
-
-                    # Get nodes on same layer using dictionary
-                    same_layer_nodes = self.layer_nodes_dict.get(joint_name)
-                    if not same_layer_nodes:
-                        continue
+                self.init_geometry(
+                    entity_path, geom.capsule, self.geometry_pose_to_matrix(geom.init_pose)
+                )
 
-                    filtered_geoms = []
-                    for node_name in same_layer_nodes:
-                        if node_name in self.scene.geometry:
-                            geom = self.scene.geometry[node_name]
-                            # Add metadata that would normally come from dump
-                            geom.metadata = {"node": node_name}
-                            filtered_geoms.append(geom)
-
-                    for geom in filtered_geoms:
-                        entity_path = f"{self.base_entity_path}/visual/links/link_{link_index}/mesh/{geom.metadata.get('node')}"
-
-                        # calculate the inverse transform to get the mesh in the correct position
-                        cumulative_transform, _ = self.scene.graph.get(frame_to=joint_name)
-                        ctransform = cumulative_transform.copy()
-                        inverse_transform = np.linalg.inv(ctransform)
-
-                        # DH theta is rotated, rotate mesh around z in direction of theta
-                        rotation_matrix_z_4x4 = np.eye(4)
-                        if len(self.robot.dh_parameters) > link_index:
-                            rotation_z_minus_90 = Rotation.from_euler(
-                                "z", self.robot.dh_parameters[link_index].theta, degrees=False
-                            ).as_matrix()
-                            rotation_matrix_z_4x4[:3, :3] = rotation_z_minus_90
-
-                        # scale positions to mm
-                        inverse_transform[:3, 3] *= 1000
-
-                        root_transform = self.get_transform_matrix()
-
-                        transform = root_transform @ inverse_transform
-
-                        final_transform = link_transform @ rotation_matrix_z_4x4 @ transform
-
-                        self.init_mesh(entity_path, geom, joint_name)
-                        collect_geometry_data(entity_path, final_transform)
-
-            # Collect data for link geometries
-            for link_index, geometries in self.link_geometries.items():
-                link_transform = transforms[link_index]
-                for i, geom in enumerate(geometries):
-                    entity_path = f"{self.base_entity_path}/safety_from_controller/links/link_{link_index}/geometry_{i}"
-                    final_transform = link_transform @ self.geometry_pose_to_matrix(geom.init_pose)
-                    self.init_geometry(entity_path, geom.capsule)
-                    collect_geometry_data(entity_path, final_transform)
-
-            # Collect data for TCP geometries
-            if self.tcp_geometries:
-                tcp_transform = transforms[-1]  # End-effector transform
-                for i, geom in enumerate(self.tcp_geometries):
-                    entity_path = f"{self.base_entity_path}/safety_from_controller/tcp/geometry_{i}"
-                    final_transform = tcp_transform @ self.geometry_pose_to_matrix(geom.init_pose)
-                    self.init_geometry(entity_path, geom.capsule)
-                    collect_geometry_data(entity_path, final_transform)
-
-            # Collect data for collision link geometries
-            for link_index, geometries in enumerate(self.collision_link_geometries):
-                link_transform = transforms[link_index]
-                for i, geom_id in enumerate(geometries):
-                    entity_path = f"{self.base_entity_path}/collision/links/link_{link_index}/geometry_{geom_id}"
-
-                    pose = normalize_pose(geometries[geom_id].pose)
-
-                    final_transform = link_transform @ self.geometry_pose_to_matrix(pose)
-                    self.init_collision_geometry(entity_path, geometries[geom_id], pose)
-                    collect_geometry_data(entity_path, final_transform)
-
-            # Collect data for collision TCP geometries
-            if self.collision_tcp_geometries:
-                tcp_transform = transforms[-1]  # End-effector transform
-                for i, geom_id in enumerate(self.collision_tcp_geometries):
-                    entity_path = f"{self.base_entity_path}/collision/tcp/geometry_{geom_id}"
-
-                    pose = normalize_pose(self.collision_tcp_geometries[geom_id].pose)
-                    final_transform = tcp_transform @ self.geometry_pose_to_matrix(pose)
-
-                    # tcp collision geometries are defined in flange frame
-                    identity_pose = models.PlannerPose(
-                        position=models.Vector3d(x=0, y=0, z=0),
-                        orientation=models.Quaternion(x=0, y=0, z=0, w=1),
-                    )
-                    self.init_collision_geometry(
-                        entity_path, self.collision_tcp_geometries[geom_id], identity_pose
-                    )
-                    collect_geometry_data(entity_path, final_transform)
+        # Log collision geometries with their precompiled offsets
+        for (entity_path, collider, pose, _), offset in zip(self.colliders, self.collider_offsets):
+            self.init_collision_geometry(entity_path, collider, pose, offset)
+
+        # Send one transform column per link frame, one batched rotation conversion per frame
+        times = np.asarray(times_column.times)
+        for entity_path, link_index in self.link_frames(link_transforms.shape[1]).items():
+            translations = link_transforms[:, link_index, :3, 3]
+            quaternions = Rotation.from_matrix(link_transforms[:, link_index, :3, :3]).as_quat()
+            frame_times = times_column
+            if keyframe_tolerance is not None:
+                keyframes = select_keyframes(translations, quaternions, *keyframe_tolerance)
+                translations, quaternions = translations[keyframes], quaternions[keyframes]
+                frame_times = rr.TimeSecondsColumn(times_column.timeline, times[keyframes])
 
-        # Send collected columns for all geometries
-        for entity_path, positions in link_positions.items():
             rr.send_columns(
                 entity_path,
-                times=[times_column],
+                times=[frame_times],
                 components=[
                     rr.Transform3D.indicator(),
-                    rr.components.Translation3DBatch(positions),
-                    rr.components.RotationAxisAngleBatch(link_rotations[entity_path]),
+                    rr.components.Translation3DBatch(translations),
+                    rr.components.RotationQuatBatch(quaternions),
                 ],
             )
+
+    def log_instanced_meshes(self, times: np.ndarray, link_transforms: np.ndarray):
+        """
+        Log the model meshes as instances shared by all robots of the same model.
+
+        The meshes are logged once below motion/instances/<model>/<lod>, per robot of the model
+        the pose of each mesh is an instance in its InstancePoses3D. Rows from the start of the
+        trajectory on are sent again with the latest pose of every robot, robots are shown from
+        their first logged sample on.
+
+        Args:
+            times (np.ndarray): Sample times in seconds of shape (N,).
+            link_transforms (np.ndarray): Link frames of the trajectory of shape (N, J+1, 4, 4).
+        """
+        key = (rr.get_recording_id(), self.model_name, self.mesh_lod, self.merge_link_meshes)
+        robots = _instanced_robots.setdefault(key, {})
+        mesh_offsets = {
+            entity_path[len(self.base_entity_path) :]: (link_index, offset)
+            for link_index, (_, meshes) in self.mesh_offsets.items()
+            for entity_path, _, offset in meshes
+        }
+
+        # Rows are only sent again from times[0] on, older samples are not needed anymore
+        history = robots.get(self.base_entity_path)
+        robots[self.base_entity_path] = (
+            *merge_sample_history(None if history is None else history[:2], times, link_transforms),
+            mesh_offsets,
+        )
+
+        grid = np.unique(np.concatenate([t[t >= times[0]] for t, _, _ in robots.values()]))
+        # Per robot the index of its latest sample at each row, -1 before its first sample
+        sample_indices = [
+            np.searchsorted(robot_times, grid, side="right") - 1
+            for robot_times, _, _ in robots.values()
+        ]
+
+        instance_path = f"motion/instances/{self.model_name}/{self.mesh_lod}"
+        for link_index, (joint_name, meshes) in self.mesh_offsets.items():
+            if link_index >= link_transforms.shape[1]:
+                break
+            for entity_path, node_names, _ in meshes:
+                suffix = entity_path[len(self.base_entity_path) :]
+                mesh_path = f"{instance_path}{suffix}"
+                self.init_mesh(mesh_path, node_names, joint_name, np.eye(4))
+
+                # Poses of shape (rows, robots, 4, 4), rows hold the robots shown at their time
+                poses = np.zeros((len(grid), len(robots), 4, 4))
+                shown = np.zeros((len(grid), len(robots)), dtype=bool)
+                for i, ((_, transforms, offsets), indices) in enumerate(
+                    zip(robots.values(), sample_indices)
+                ):
+                    if suffix not in offsets or offsets[suffix][0] >= transforms.shape[1]:
+                        continue
+                    robot_link, offset = offsets[suffix]
+                    shown[:, i] = indices >= 0
+                    poses[shown[:, i], i] = transforms[indices[shown[:, i]], robot_link] @ offset
+
+                poses = poses[shown]
+                rr.send_columns(
+                    mesh_path,
+                    times=[rr.TimeSecondsColumn(TIME_INTERVAL_NAME, grid)],
+                    components=[
+                        rr.InstancePoses3D.indicator(),
+                        rr.components.PoseTranslation3DBatch(poses[:, :3, 3]).partition(
+                            shown.sum(axis=1)
+                        ),
+                        rr.components.PoseRotationQuatBatch(
+                            Rotation.from_matrix(poses[:, :3, :3]).as_quat()
+                        ).partition(shown.sum(axis=1)),
+                    ],
+                )
@@ -0,0 +1,39 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def merge_sample_history(
+    history: Optional[Tuple[np.ndarray, ...]], times: np.ndarray, *values: np.ndarray
+) -> Tuple[np.ndarray, ...]:
+    """
+    Merge newly logged samples into the time sorted sample history of a motion group.
+
+    A newly logged motion replaces whatever was logged in its time range before. Of the samples
+    before it only the last one is kept, which is all a latest-at or interpolating lookup from the
+    new samples on needs, so the history does not grow with the length of the recording.
+
+    Args:
+        history: Previous (times, *values) with sorted times, None if nothing was logged yet.
+        times: Sorted times of the new samples of shape (N,).
+        values: Arrays with one entry per new sample, in the order of the history values.
+
+    Returns:
+        Tuple[np.ndarray, ...]: The merged (times, *values), sorted by time.
+    """
+    if history is None or len(history[0]) == 0:
+        return (times, *values)
+    if len(times) == 0:
+        return history
+
+    history_times = history[0]
+    first = max(int(np.searchsorted(history_times, times[0])) - 1, 0)
+    keep = np.arange(first, len(history_times))
+    keep = keep[(history_times[keep] < times[0]) | (history_times[keep] > times[-1])]
+
+    merged_times = np.concatenate([history_times[keep], times])
+    order = np.argsort(merged_times, kind="stable")
+    return (
+        merged_times[order],
+        *(np.concatenate([old[keep], new])[order] for old, new in zip(history[1:], values)),
+    )
@@ -1,5 +1,7 @@
 import asyncio
+from typing import Optional
 
+import numpy as np
 import rerun as rr
 from loguru import logger
 from nova import MotionGroup
@@ -7,13 +9,18 @@ from scipy.spatial.transform import Rotation as R
 
 from nova_rerun_bridge import colors
 from nova_rerun_bridge.consts import TIME_INTERVAL_NAME
-from nova_rerun_bridge.dh_robot import DHRobot
+from nova_rerun_bridge.dh_robot import DHRobot, patch_dh_parameters
 from nova_rerun_bridge.robot_visualizer import RobotVisualizer
 
 
-def log_joint_positions_once(motion_group: str, robot: DHRobot, joint_position):
-    """Compute and log joint positions for a robot."""
-    joint_positions = robot.calculate_joint_positions(joint_position)
+def log_joint_positions_once(
+    motion_group: str, robot: DHRobot, joint_position, link_transforms: Optional[np.ndarray] = None
+):
+    """Compute and log joint positions for a robot, reusing precomputed link transforms if given."""
+    if link_transforms is None:
+        joint_positions = robot.calculate_joint_positions(joint_position)
+    else:
+        joint_positions = link_transforms[:, :3, 3].tolist()
     line_segments = [
         [joint_positions[i], joint_positions[i + 1]] for i in range(len(joint_positions) - 1)
     ]
@@ -52,15 +59,12 @@ class MotionGroupProcessor:
     def log_tcp_orientation(self, motion_group: str, tcp_pose):
         """Log TCP orientation and position."""
         rotation_vector = [tcp_pose.orientation.x, tcp_pose.orientation.y, tcp_pose.orientation.z]
-        rotation = R.from_rotvec(rotation_vector)
-        angle = rotation.magnitude() if rotation.magnitude() != 0 else 0.0
-        axis_angle = rotation.as_rotvec() / angle if angle != 0 else [0, 0, 0]
 
         rr.log(
             f"{motion_group}/tcp_position",
             rr.Transform3D(
                 translation=[tcp_pose.position.x, tcp_pose.position.y, tcp_pose.position.z],
-                rotation=rr.RotationAxisAngle(axis=axis_angle, angle=angle),
+                quaternion=rr.Quaternion(xyzw=R.from_rotvec(rotation_vector).as_quat()),
             ),
             static=True,
         )
@@ -88,7 +92,12 @@ async def stream_motion_group(self, motion_group: MotionGroup) -> None:
             )
         )
 
-        robot = DHRobot(optimizer_config.dh_parameters, optimizer_config.mounting)
+        robot = DHRobot(
+            patch_dh_parameters(
+                motion_motion_group.model_from_controller, optimizer_config.dh_parameters
+            ),
+            optimizer_config.mounting,
+        )
         visualizer = RobotVisualizer(
             robot=robot,
             robot_model_geometries=optimizer_config.safety_setup.robot_model_geometries,
@@ -97,6 +106,7 @@ async def stream_motion_group(self, motion_group: MotionGroup) -> None:
             base_entity_path=motion_group.motion_group_id,
             albedo_factor=[0, 255, 100],
             model_from_controller=motion_motion_group.model_from_controller,
+            merge_link_meshes=self.merge_link_meshes,
         )
 
         logger.info(f"Started streaming motion group {motion_group}")
@@ -104,13 +114,15 @@ async def stream_motion_group(self, motion_group: MotionGroup) -> None:
             self.nova.cell()._cell_id, motion_group.motion_group_id
         ):
             if processor.tcp_pose_changed(motion_group, state.state.tcp_pose):
-                # Log joint positions
-                log_joint_positions_once(
-                    motion_group.motion_group_id, robot, state.state.joint_position
-                )
-
-                # Log robot geometries
-                visualizer.log_robot_geometry(state.state.joint_position)
+                # Log robot geometries of the links that moved since the last state
+                if visualizer.log_robot_geometry(state.state.joint_position):
+                    # Log joint positions
+                    log_joint_positions_once(
+                        motion_group.motion_group_id,
+                        robot,
+                        state.state.joint_position,
+                        link_transforms=visualizer.last_link_transforms,
+                    )
 
                 processor.log_tcp_orientation(motion_group.motion_group_id, state.state.tcp_pose)
 
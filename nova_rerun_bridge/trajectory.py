@@ -1,5 +1,7 @@
+import hashlib
+import json
 from enum import Enum, auto
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import rerun as rr
@@ -7,9 +9,11 @@ from nova.api import models
 from scipy.spatial.transform import Rotation
 
 from nova_rerun_bridge.collision_scene import extract_link_chain_and_tcp
-from nova_rerun_bridge.consts import TIME_INTERVAL_NAME
-from nova_rerun_bridge.dh_robot import DHRobot
+from nova_rerun_bridge.consts import SINGULARITY_THRESHOLD, TIME_INTERVAL_NAME
+from nova_rerun_bridge.dh_robot import CompositeDHRobot, DHRobot, patch_dh_parameters
+from nova_rerun_bridge.model_cache import get_mesh_lod
 from nova_rerun_bridge.robot_visualizer import RobotVisualizer
+from nova_rerun_bridge.sample_history import merge_sample_history
 
 
 class TimingMode(Enum):
@@ -25,6 +29,22 @@ class TimingMode(Enum):
 _last_end_time = 0.0
 _last_offset = 0.0
 
+# DHRobot and RobotVisualizer per (recording, motion group) with the hash of their configuration
+_motion_group_contexts: Dict[Tuple[str, str], Tuple[str, DHRobot, RobotVisualizer]] = {}
+
+# Settings (max entries, tolerance) of the FK cache of new contexts, None if disabled
+_fk_cache_settings: Optional[Tuple[int, float]] = None
+
+# Carrying motion group per carried motion group, e.g. the linear track a robot is mounted on
+_carriers: Dict[str, str] = {}
+
+# Indices of the linear joints per carrier motion group, all other joints are revolute
+_linear_axes: Dict[str, Tuple[int, ...]] = {}
+
+# Logged joint trajectories of carriers per (recording, motion group) as (times, joint values),
+# pruned to the last sample before the latest motion and everything after it
+_joint_histories: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+
 
 def log_motion(
     motion_id: str,
@@ -35,6 +55,9 @@ def log_motion(
     collision_scenes: Dict[str, models.CollisionScene],
     time_offset: float = 0,
     timing_mode: TimingMode = TimingMode.CONTINUE,
+    merge_link_meshes: bool = False,
+    instanced_meshes: bool = False,
+    keyframe_tolerance: Optional[Tuple[float, float]] = None,
 ):
     """
     Fetch and process a single motion with timing control.
@@ -45,6 +68,10 @@ def log_motion(
             RESET: Start at time_offset (default)
             CONTINUE: Start after last trajectory
             SYNC: Use exact time_offset provided
+        merge_link_meshes: Log the model meshes of each link as one merged entity
+        instanced_meshes: Share the model meshes between all motion groups of the same model
+        keyframe_tolerance: Translation (mm) and rotation (rad) tolerance up to which samples of
+            the geometry transforms are dropped, scalar data is always logged at every sample
     """
     global _last_end_time, _last_offset
 
@@ -60,31 +87,14 @@ def log_motion(
         effective_offset = time_offset
         _last_end_time = time_offset
 
-    # Initialize DHRobot and Visualizer
-    if model_from_controller == "Yaskawa_TURN2":
-        optimizer_config.dh_parameters[0].a = 0
-        optimizer_config.dh_parameters[0].d = 360
-        optimizer_config.dh_parameters[0].alpha = np.pi / 2
-        optimizer_config.dh_parameters[0].theta = 0
-
-        optimizer_config.dh_parameters[1].a = 0
-        optimizer_config.dh_parameters[1].d = 0
-        optimizer_config.dh_parameters[1].alpha = 0
-        optimizer_config.dh_parameters[1].theta = np.pi / 2
-
-    robot = DHRobot(optimizer_config.dh_parameters, optimizer_config.mounting)
-
-    collision_link_chain, collision_tcp = extract_link_chain_and_tcp(collision_scenes)
-
-    visualizer = RobotVisualizer(
-        robot=robot,
-        robot_model_geometries=optimizer_config.safety_setup.robot_model_geometries,
-        tcp_geometries=optimizer_config.safety_setup.tcp_geometries,
-        static_transform=False,
-        base_entity_path=f"motion/{motion_group}",
+    # Reuse the DHRobot and Visualizer of previous motions of this motion group
+    robot, visualizer = get_motion_group_context(
+        motion_group=motion_group,
         model_from_controller=model_from_controller,
-        collision_link_chain=collision_link_chain,
-        collision_tcp=collision_tcp,
+        optimizer_config=optimizer_config,
+        collision_scenes=collision_scenes,
+        merge_link_meshes=merge_link_meshes,
+        instanced_meshes=instanced_meshes,
     )
 
     rr.set_time_seconds(TIME_INTERVAL_NAME, effective_offset)
@@ -98,6 +108,7 @@ def log_motion(
         trajectory=trajectory,
         optimizer_config=optimizer_config,
         timer_offset=effective_offset,
+        keyframe_tolerance=keyframe_tolerance,
     )
 
     # Update last times based on timing mode
@@ -109,8 +120,174 @@ def log_motion(
             _last_end_time = effective_offset + trajectory[-1].time
 
     del trajectory
-    del robot
-    del visualizer
+
+
+def _config_hash(*parts) -> str:
+    """Hash pydantic models and plain values into a stable key."""
+
+    def default(obj):
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump()
+        return repr(obj)
+
+    payload = json.dumps(parts, default=default, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_motion_group_context(
+    motion_group: str,
+    model_from_controller: str,
+    optimizer_config: models.OptimizerSetup,
+    collision_scenes: Dict[str, models.CollisionScene],
+    merge_link_meshes: bool = False,
+    instanced_meshes: bool = False,
+) -> Tuple[DHRobot, RobotVisualizer]:
+    """
+    Get the kinematics and visualizer of a motion group, creating them on first use.
+
+    The context is kept alive between motions of the same recording and is rebuilt
+    whenever the model, mesh options, DH parameters, mounting, safety setup or collision
+    setup change.
+    """
+    collision_link_chain, collision_tcp = extract_link_chain_and_tcp(collision_scenes)
+
+    key = (rr.get_recording_id(), motion_group)
+    linear_axes = _linear_axes.get(motion_group, ())
+    config_hash = _config_hash(
+        model_from_controller,
+        linear_axes,
+        get_mesh_lod(),
+        merge_link_meshes,
+        instanced_meshes,
+        optimizer_config.dh_parameters,
+        optimizer_config.mounting,
+        optimizer_config.safety_setup,
+        collision_link_chain,
+        collision_tcp,
+    )
+
+    context = _motion_group_contexts.get(key)
+    if context is not None and context[0] == config_hash:
+        return context[1], context[2]
+
+    robot = DHRobot(
+        patch_dh_parameters(model_from_controller, optimizer_config.dh_parameters),
+        optimizer_config.mounting,
+        prismatic_joints=linear_axes,
+    )
+
+    visualizer = RobotVisualizer(
+        robot=robot,
+        robot_model_geometries=optimizer_config.safety_setup.robot_model_geometries,
+        tcp_geometries=optimizer_config.safety_setup.tcp_geometries,
+        static_transform=False,
+        base_entity_path=f"motion/{motion_group}",
+        model_from_controller=model_from_controller,
+        collision_link_chain=collision_link_chain,
+        collision_tcp=collision_tcp,
+        merge_link_meshes=merge_link_meshes,
+        instanced=instanced_meshes,
+    )
+
+    if _fk_cache_settings is not None:
+        robot.enable_fk_cache(*_fk_cache_settings)
+
+    _motion_group_contexts[key] = (config_hash, robot, visualizer)
+    return robot, visualizer
+
+
+def configure_fk_cache(max_entries: Optional[int] = 20_000, tolerance: float = 1e-6):
+    """
+    Memoize forward kinematics of recurring joint configurations across motions.
+
+    Useful for cells repeating the same cycle, where replanned motions share most of their
+    samples. Applies to existing and future motion group contexts.
+
+    Args:
+        max_entries: Joint configurations kept per motion group, None disables the cache.
+        tolerance: Quantization step of the joint values (in radians) used as cache key.
+    """
+    global _fk_cache_settings
+
+    _fk_cache_settings = None if max_entries is None else (max_entries, tolerance)
+    for _, robot, _ in _motion_group_contexts.values():
+        if _fk_cache_settings is None:
+            robot.disable_fk_cache()
+        else:
+            robot.enable_fk_cache(*_fk_cache_settings)
+
+
+def fk_cache_stats() -> Dict[str, Tuple[int, int, float]]:
+    """Get the FK cache hits, misses and hit rate per motion group of the current recording."""
+    recording_id = rr.get_recording_id()
+    return {
+        motion_group: (robot.fk_cache.hits, robot.fk_cache.misses, robot.fk_cache.hit_rate)
+        for (recording, motion_group), (_, robot, _) in _motion_group_contexts.items()
+        if recording == recording_id and robot.fk_cache is not None
+    }
+
+
+def set_carrier(
+    motion_group: str,
+    carrier_motion_group: Optional[str],
+    carrier_linear_axes: Optional[Sequence[int]] = None,
+):
+    """
+    Mount a motion group on the flange of another one, e.g. a robot on a linear track or a
+    turntable.
+
+    The mounting of the carried motion group is then interpreted relative to the carrier's flange,
+    and its trajectories are positioned by the carrier's joint values at the same times. Only the
+    joint values of registered carriers are kept, so the carrier has to be registered before its
+    motion is logged and its motion has to be logged before the motions it carries.
+
+    Args:
+        motion_group: The carried motion group.
+        carrier_motion_group: The carrying motion group, None to mount on the world again.
+        carrier_linear_axes: Indices of the carrier joints that are linear (in mm), e.g. the
+            axis of a linear track. The DH table does not tell them apart from revolute joints,
+            all carrier joints are revolute if not given.
+    """
+    if carrier_motion_group is None:
+        _carriers.pop(motion_group, None)
+    else:
+        _carriers[motion_group] = carrier_motion_group
+        _linear_axes[carrier_motion_group] = tuple(carrier_linear_axes or ())
+
+    # Forget the joint values of motion groups that no longer carry anything
+    for key in [key for key in _joint_histories if key[1] not in _carriers.values()]:
+        del _joint_histories[key]
+
+
+def _record_joint_history(motion_group: str, times: np.ndarray, joint_values: np.ndarray):
+    """Remember the logged joint values so carried motion groups can be positioned later."""
+    if motion_group not in _carriers.values():
+        return
+
+    key = (rr.get_recording_id(), motion_group)
+    _joint_histories[key] = merge_sample_history(_joint_histories.get(key), times, joint_values)
+
+
+def _carrier_joint_values(
+    motion_group: str, times: np.ndarray
+) -> Optional[Tuple[DHRobot, np.ndarray]]:
+    """Get the carrier kinematics and its joint values interpolated at the given times."""
+    carrier = _carriers.get(motion_group)
+    if carrier is None:
+        return None
+
+    key = (rr.get_recording_id(), carrier)
+    context = _motion_group_contexts.get(key)
+    history = _joint_histories.get(key)
+    if context is None or history is None or len(history[0]) == 0:
+        return None
+
+    history_times, history_joints = history
+    # Values outside the logged range are held at the first/last carrier sample
+    joint_values = np.stack(
+        [np.interp(times, history_times, joints) for joints in history_joints.T], axis=1
+    )
+    return context[1], joint_values
 
 
 def continue_after_sync():
@@ -123,11 +300,18 @@ def continue_after_sync():
 
 
 def log_trajectory_path(
-    motion_id: str, trajectory: List[models.TrajectorySample], motion_group: str
+    motion_id: str,
+    trajectory: List[models.TrajectorySample],
+    motion_group: str,
+    tcp_positions: Optional[np.ndarray] = None,
 ):
-    points = [
-        [p.tcp_pose.position.x, p.tcp_pose.position.y, p.tcp_pose.position.z] for p in trajectory
-    ]
+    if tcp_positions is not None:
+        points = tcp_positions
+    else:
+        points = [
+            [p.tcp_pose.position.x, p.tcp_pose.position.y, p.tcp_pose.position.z]
+            for p in trajectory
+        ]
     rr.log(
         f"motion/{motion_group}/trajectory",
         rr.LineStrips3D([points], colors=[[1.0, 1.0, 1.0, 1.0]]),
@@ -152,6 +336,7 @@ def log_trajectory(
     trajectory: List[models.TrajectorySample],
     optimizer_config: models.OptimizerSetup,
     timer_offset: float,
+    keyframe_tolerance: Optional[Tuple[float, float]] = None,
 ):
     """
     Process a single trajectory point and log relevant data.
@@ -160,13 +345,35 @@ def log_trajectory(
 
     times_column = get_times_column(trajectory, timer_offset)
 
-    log_trajectory_path(motion_id, trajectory, motion_group)
+    # Calculate the forward kinematics once, shared by the line strips and the geometries
+    joint_values = np.array(
+        [point.joint_position.joints for point in trajectory], dtype=np.float64
+    ).reshape(len(trajectory), -1)
+    _record_joint_history(motion_group, times_column.times, joint_values)
+
+    carrier = _carrier_joint_values(motion_group, times_column.times)
+    if carrier is None:
+        link_transforms = robot.calculate_link_transforms_batch(joint_values)
+    else:
+        # Position the robot by its carrier's flange, both chains in one batched pass
+        _, link_transforms = CompositeDHRobot(carrier[0], robot).calculate_link_transforms_batch(
+            carrier[1], joint_values
+        )
+
+    # Trajectories without TCP poses (e.g. from to_trajectory_samples) show the kinematic TCP
+    tcp_poses = None
+    if any(point.tcp_pose is None for point in trajectory):
+        tcp = getattr(optimizer_config, "tcp", None)
+        tcp_poses = link_transforms[:, -1]
+        if tcp is not None:
+            tcp_poses = tcp_poses @ robot.pose_to_matrix(tcp)
 
-    # Calculate and log joint positions
-    line_segments_batch = []
-    for point in trajectory:
-        joint_positions = robot.calculate_joint_positions(point.joint_position)
-        line_segments_batch.append(joint_positions)
+    log_trajectory_path(
+        motion_id, trajectory, motion_group, None if tcp_poses is None else tcp_poses[:, :3, 3]
+    )
+
+    # Log joint positions
+    line_segments_batch = link_transforms[:, :, :3, 3]
 
     rr.send_columns(
         f"motion/{motion_group}/dh_parameters",
@@ -179,10 +386,15 @@ def log_trajectory(
     )
 
     # Log the robot geometries
-    visualizer.log_robot_geometries(trajectory, times_column)
+    visualizer.log_robot_geometries(
+        trajectory,
+        times_column,
+        link_transforms=link_transforms,
+        keyframe_tolerance=keyframe_tolerance,
+    )
 
     # Log TCP pose/orientation
-    log_tcp_pose(trajectory, motion_group, times_column)
+    log_tcp_pose(trajectory, motion_group, times_column, tcp_poses)
 
     # Log joint data
     log_joint_data(trajectory, motion_group, times_column, optimizer_config)
@@ -190,39 +402,48 @@ def log_trajectory(
     # Log scalar data
     log_scalar_values(trajectory, motion_group, times_column, optimizer_config)
 
+    # Log TCP velocity and singularity analytics derived from the kinematic model
+    log_kinematic_values(
+        trajectory, motion_group, times_column, robot, link_transforms, optimizer_config
+    )
+
 
-def log_tcp_pose(trajectory: List[models.TrajectorySample], motion_group, times_column):
+def log_tcp_pose(
+    trajectory: List[models.TrajectorySample],
+    motion_group,
+    times_column,
+    tcp_poses: Optional[np.ndarray] = None,
+):
     """
-    Log TCP pose (position + orientation) data.
+    Log TCP pose (position + orientation) data, from the given (N, 4, 4) poses if the trajectory
+    samples do not carry them.
     """
-    tcp_positions = []
-    tcp_rotations = []
-
-    # Collect data from the trajectory
-    for point in trajectory:
-        # Collect TCP position
-        tcp_positions.append(
-            [point.tcp_pose.position.x, point.tcp_pose.position.y, point.tcp_pose.position.z]
+    if tcp_poses is not None:
+        tcp_positions = tcp_poses[:, :3, 3]
+        rotations = Rotation.from_matrix(tcp_poses[:, :3, :3])
+    else:
+        tcp_positions = np.array(
+            [
+                [p.tcp_pose.position.x, p.tcp_pose.position.y, p.tcp_pose.position.z]
+                for p in trajectory
+            ]
+        ).reshape(-1, 3)
+        rotations = Rotation.from_rotvec(
+            np.array(
+                [
+                    [p.tcp_pose.orientation.x, p.tcp_pose.orientation.y, p.tcp_pose.orientation.z]
+                    for p in trajectory
+                ]
+            ).reshape(-1, 3)
         )
 
-        # Convert and collect TCP orientation as axis-angle
-        rotation_vector = [
-            point.tcp_pose.orientation.x,
-            point.tcp_pose.orientation.y,
-            point.tcp_pose.orientation.z,
-        ]
-        rotation = Rotation.from_rotvec(rotation_vector)
-        angle = rotation.magnitude()
-        axis_angle = rotation.as_rotvec() / angle if angle != 0 else [0, 0, 0]
-        tcp_rotations.append(rr.RotationAxisAngle(axis=axis_angle, angle=angle))
-
     rr.send_columns(
         f"motion/{motion_group}/tcp_position",
         times=[times_column],
         components=[
             rr.Transform3D.indicator(),
             rr.components.Translation3DBatch(tcp_positions),
-            rr.components.RotationAxisAngleBatch(tcp_rotations),
+            rr.components.RotationQuatBatch(rotations.as_quat()),
         ],
     )
 
@@ -255,8 +476,11 @@ def log_joint_data(
     # Collect data from the trajectory
     for point in trajectory:
         for i in range(num_joints):
-            joint_data["velocity"][i].append(point.joint_velocity.joints[i])
-            joint_data["acceleration"][i].append(point.joint_acceleration.joints[i])
+            # Velocities and accelerations are missing e.g. in trajectories from joint positions
+            if point.joint_velocity and len(point.joint_velocity.joints) > i:
+                joint_data["velocity"][i].append(point.joint_velocity.joints[i])
+            if point.joint_acceleration and len(point.joint_acceleration.joints) > i:
+                joint_data["acceleration"][i].append(point.joint_acceleration.joints[i])
             joint_data["position"][i].append(point.joint_position.joints[i])
             if point.joint_torques and len(point.joint_torques.joints) > i:
                 joint_data["torque"][i].append(point.joint_torques.joints[i])
@@ -285,10 +509,10 @@ def log_joint_data(
                     optimizer_config.safety_setup.global_limits.joint_torque_limits[i]
                 )
 
-    # Send columns if data is not empty
+    # Send columns that have a value for every sample
     for data_type, data in joint_data.items():
         for i in range(num_joints):
-            if data[i]:
+            if data[i] and len(data[i]) == len(trajectory):
                 rr.send_columns(
                     f"motion/{motion_group}/joint_{data_type}_{i + 1}",
                     times=[times_column],
@@ -374,6 +598,138 @@ def log_scalar_values(
             )
 
 
+def log_kinematic_values(
+    trajectory: List[models.TrajectorySample],
+    motion_group,
+    times_column,
+    robot: DHRobot,
+    link_transforms: np.ndarray,
+    optimizer_config: models.OptimizerSetup,
+):
+    """
+    Log TCP velocity, manipulability and singularity proximity computed from the Jacobian.
+
+    The TCP velocities are only logged if the trajectory samples do not carry them.
+    Joint velocities are estimated from the joint positions if they are missing.
+    """
+    if len(trajectory) == 0:
+        return
+
+    tcp = getattr(optimizer_config, "tcp", None)
+    tcp_offset = robot.pose_to_matrix(tcp) if tcp is not None else None
+    jacobian = robot.calculate_jacobian_batch(link_transforms, tcp_offset)
+    num_joints = jacobian.shape[2]
+
+    if all(point.joint_velocity is not None for point in trajectory):
+        joint_velocities = np.array(
+            [point.joint_velocity.joints[:num_joints] for point in trajectory], dtype=np.float64
+        )
+    elif len(trajectory) > 1:
+        joint_positions = np.array(
+            [point.joint_position.joints[:num_joints] for point in trajectory], dtype=np.float64
+        )
+        times = np.array([point.time for point in trajectory], dtype=np.float64)
+        joint_velocities = np.gradient(joint_positions, times, axis=0)
+    else:
+        joint_velocities = np.zeros((1, num_joints))
+
+    scalar_data = {}
+
+    tcp_twist = np.einsum("nij,nj->ni", jacobian, joint_velocities)
+    if all(point.tcp_velocity is None for point in trajectory):
+        scalar_data["tcp_velocity"] = np.linalg.norm(tcp_twist[:, :3], axis=1)
+    if all(point.tcp_orientation_velocity is None for point in trajectory):
+        scalar_data["tcp_orientation_velocity"] = np.linalg.norm(tcp_twist[:, 3:], axis=1)
+
+    # Use meters for the linear part so both parts of the Jacobian have comparable magnitudes
+    scaled_jacobian = jacobian.copy()
+    scaled_jacobian[:, :3] /= 1000.0
+    singular_values = np.linalg.svd(scaled_jacobian, compute_uv=False)
+    inverse_condition = singular_values[:, -1] / np.maximum(singular_values[:, 0], 1e-12)
+    scalar_data["manipulability"] = np.prod(singular_values, axis=1)
+    scalar_data["singularity_proximity"] = 1.0 - inverse_condition
+
+    for key, values in scalar_data.items():
+        rr.send_columns(
+            f"motion/{motion_group}/{key}",
+            times=[times_column],
+            components=[rr.components.ScalarBatch(values)],
+        )
+
+    # Warn once for every segment of the trajectory that gets close to a singularity
+    near_singularity = inverse_condition < SINGULARITY_THRESHOLD
+    segment_starts = np.flatnonzero(near_singularity & ~np.r_[False, near_singularity[:-1]])
+    if len(segment_starts) > 0:
+        times = times_column.times[segment_starts]
+        rr.send_columns(
+            "logs/motion",
+            times=[rr.TimeSecondsColumn(TIME_INTERVAL_NAME, times)],
+            components=[
+                rr.TextLog.indicator(),
+                rr.components.TextBatch(
+                    [f"{motion_group}: close to singularity at t={t:.3f}s" for t in times]
+                ),
+                rr.components.TextLogLevelBatch([rr.TextLogLevel.WARN] * len(times)),
+            ],
+        )
+
+
+def log_action_ghosts(
+    motion_group: str,
+    robot: DHRobot,
+    target_poses: np.ndarray,
+    tcp_offset: Optional[np.ndarray] = None,
+    joint_limits: Optional[np.ndarray] = None,
+    reference_joints: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Solve the inverse kinematics for all target poses in one batch and log a ghost robot at each.
+
+    Of all valid configurations of a pose, the one closest to the configuration of the previous
+    pose is shown, starting from reference_joints.
+
+    Returns:
+        np.ndarray: The chosen joint configuration per pose of shape (N, J), NaN if unreachable.
+    """
+    solutions, valid = robot.calculate_inverse_kinematics_batch(
+        target_poses, tcp_offset=tcp_offset, joint_limits=joint_limits
+    )
+
+    chosen = np.full((len(solutions), solutions.shape[2]), np.nan)
+    previous = (
+        np.zeros(solutions.shape[2])
+        if reference_joints is None
+        else np.asarray(reference_joints, dtype=np.float64)[: solutions.shape[2]]
+    )
+    distances = np.where(valid, 0.0, np.inf)
+    for i in range(len(solutions)):
+        if not valid[i].any():
+            continue
+        best = np.argmin(distances[i] + np.linalg.norm(solutions[i] - previous, axis=1))
+        chosen[i] = previous = solutions[i, best]
+
+    reachable = ~np.isnan(chosen[:, 0])
+    if reachable.any():
+        joint_positions = robot.calculate_joint_positions_batch(chosen[reachable])
+        rr.log(
+            f"motion/actions/{motion_group}/ghosts",
+            rr.LineStrips3D(joint_positions, colors=[[155, 155, 155, 120]]),
+            timeless=True,
+            static=True,
+        )
+
+    if not reachable.all():
+        rr.log(
+            "logs/motion",
+            rr.TextLog(
+                f"{motion_group}: {np.count_nonzero(~reachable)} action poses are not reachable",
+                level=rr.TextLogLevel.WARN,
+            ),
+        )
+
+    return chosen
+
+
 def to_trajectory_samples(self) -> List[models.TrajectorySample]:
     """Convert JointTrajectory to list of TrajectorySample objects."""
     samples = []
@@ -0,0 +1,126 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import rerun as rr
+
+from nova_rerun_bridge import colors
+from nova_rerun_bridge.consts import WORKSPACE_MEMORY_BUDGET
+from nova_rerun_bridge.dh_robot import DHRobot
+
+# Voxel indices are packed into one int64 key with 21 bits per axis
+_VOXEL_INDEX_OFFSET = 1 << 20
+
+
+def workspace_chunk_size(num_joints: int, memory_budget: int = WORKSPACE_MEMORY_BUDGET) -> int:
+    """Number of configurations whose forward kinematics fit into the memory budget (bytes)."""
+    # joint values, J DH matrices and J+1 link frames per configuration, all float64
+    bytes_per_sample = 8 * (num_joints + 16 * (2 * num_joints + 1))
+    return max(1, memory_budget // bytes_per_sample)
+
+
+def compute_reachable_voxels(
+    robot: DHRobot,
+    joint_limits: np.ndarray,
+    num_samples: int = 1_000_000,
+    voxel_size: float = 50.0,
+    tcp_offset: Optional[np.ndarray] = None,
+    memory_budget: int = WORKSPACE_MEMORY_BUDGET,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the joint space uniformly and bin the reached TCP positions into a voxel grid.
+
+    The samples are processed in chunks so that the forward kinematics never exceed the memory
+    budget, independent of num_samples.
+
+    Args:
+        robot: The kinematics of the motion group.
+        joint_limits: Array of shape (J, 2) with lower and upper joint limits in radians.
+        num_samples: Number of joint configurations to sample.
+        voxel_size: Edge length of a voxel in mm.
+        tcp_offset: Optional 4x4 flange to TCP transform.
+        memory_budget: Upper bound of the bytes used per forward kinematics chunk.
+        seed: Seed of the random generator for reproducible workspaces.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The integer indices of the occupied voxels of shape (M, 3)
+            and the number of samples that fell into each of them of shape (M,).
+    """
+    joint_limits = np.asarray(joint_limits, dtype=np.float64)
+    lower, upper = joint_limits[:, 0], joint_limits[:, 1]
+    tcp_position = np.zeros(3) if tcp_offset is None else np.asarray(tcp_offset)[:3, 3]
+
+    rng = np.random.default_rng(seed)
+    chunk_size = workspace_chunk_size(len(joint_limits), memory_budget)
+
+    keys = np.empty(0, dtype=np.int64)
+    counts = np.empty(0, dtype=np.int64)
+    for start in range(0, num_samples, chunk_size):
+        joint_values = rng.uniform(
+            lower, upper, size=(min(chunk_size, num_samples - start), len(joint_limits))
+        )
+        flange = robot.calculate_link_transforms_batch(joint_values)[:, -1]
+        positions = flange[:, :3, 3] + flange[:, :3, :3] @ tcp_position
+
+        voxels = np.floor(positions / voxel_size).astype(np.int64) + _VOXEL_INDEX_OFFSET
+        chunk_keys, chunk_counts = np.unique(
+            (voxels[:, 0] << 42) | (voxels[:, 1] << 21) | voxels[:, 2], return_counts=True
+        )
+        # Merge with the voxels of the previous chunks, the result stays bounded by the grid
+        keys, inverse = np.unique(np.concatenate([keys, chunk_keys]), return_inverse=True)
+        counts = np.bincount(
+            inverse.reshape(-1), weights=np.concatenate([counts, chunk_counts]), minlength=len(keys)
+        ).astype(np.int64)
+
+    mask = (1 << 21) - 1
+    voxels = np.stack([keys >> 42, (keys >> 21) & mask, keys & mask], axis=1) - _VOXEL_INDEX_OFFSET
+    return voxels, counts
+
+
+def log_reachable_workspace(
+    motion_group: str,
+    robot: DHRobot,
+    joint_limits: np.ndarray,
+    num_samples: int = 1_000_000,
+    voxel_size: float = 50.0,
+    tcp_offset: Optional[np.ndarray] = None,
+    as_boxes: bool = False,
+    memory_budget: int = WORKSPACE_MEMORY_BUDGET,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Log the reachable workspace of a motion group as point cloud or voxel boxes.
+
+    Voxel centers are shaded by how many sampled configurations reached them, dense regions are
+    reachable in more configurations.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The voxel indices and sample counts, see
+            compute_reachable_voxels.
+    """
+    voxels, counts = compute_reachable_voxels(
+        robot,
+        joint_limits,
+        num_samples=num_samples,
+        voxel_size=voxel_size,
+        tcp_offset=tcp_offset,
+        memory_budget=memory_budget,
+        seed=seed,
+    )
+    centers = (voxels + 0.5) * voxel_size
+
+    density = np.log1p(counts) / np.log1p(counts.max()) if len(counts) else counts
+    voxel_colors = np.empty((len(voxels), 4), dtype=np.uint8)
+    voxel_colors[:, :3] = colors.colors[6]
+    voxel_colors[:, 3] = (40 + 160 * density).astype(np.uint8)
+
+    if as_boxes:
+        archetype = rr.Boxes3D(
+            centers=centers, half_sizes=[[voxel_size / 2] * 3], colors=voxel_colors
+        )
+    else:
+        archetype = rr.Points3D(centers, colors=voxel_colors, radii=voxel_size / 4)
+
+    rr.log(f"motion/{motion_group}/workspace", archetype, timeless=True, static=True)
+
+    return voxels, counts
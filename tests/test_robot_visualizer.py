@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+import rerun as rr
+
+from nova_rerun_bridge.robot_visualizer import is_geometry_logged
+
+
+class IsGeometryLoggedTest(unittest.TestCase):
+    def setUp(self):
+        rr.init("test_robot_visualizer", recording_id=self.id())
+        rr.memory_recording()
+
+    def test_identical_geometry_is_skipped_at_later_times(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertTrue(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertTrue(is_geometry_logged("robot/link", "a", 20.0))
+
+    def test_identical_geometry_is_logged_at_earlier_times(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertFalse(is_geometry_logged("robot/link", "a", 5.0))
+        self.assertTrue(is_geometry_logged("robot/link", "a", 7.0))
+
+    def test_out_of_order_logs_resend_geometry_shadowed_later(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 20.0))
+        self.assertFalse(is_geometry_logged("robot/link", "b", 5.0))
+        # Latest-at t=25 resolves to "a" logged at t=20
+        self.assertFalse(is_geometry_logged("robot/link", "b", 25.0))
+        self.assertTrue(is_geometry_logged("robot/link", "b", 30.0))
+
+    def test_geometry_logged_before_other_geometry_is_logged(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 20.0))
+        self.assertFalse(is_geometry_logged("robot/link", "b", 5.0))
+        # "b" at t=10 would be shown until t=20 already, but "a" follows it
+        self.assertFalse(is_geometry_logged("robot/link", "b", 10.0))
+
+    def test_same_time_logs_replace_each_other(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertFalse(is_geometry_logged("robot/link", "b", 10.0))
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertTrue(is_geometry_logged("robot/link", "a", 10.0))
+
+    def test_static_geometry(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", -np.inf))
+        self.assertTrue(is_geometry_logged("robot/link", "a", -np.inf))
+        self.assertTrue(is_geometry_logged("robot/link", "a", 10.0))
+
+    def test_entities_and_recordings_are_independent(self):
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+        self.assertFalse(is_geometry_logged("robot/other_link", "a", 10.0))
+        rr.init("test_robot_visualizer", recording_id=f"{self.id()}_other")
+        self.assertFalse(is_geometry_logged("robot/link", "a", 10.0))
+
+
+if __name__ == "__main__":
+    unittest.main()